@@ -1 +1,6 @@
 """Guitar app package."""
+
+import time
+
+# Start of the package import, for the import timing in ``app.startup``.
+IMPORT_STARTED = time.perf_counter()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import io
+import pstats
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import FileResponse, PlainTextResponse, Response
+
+from .. import profiling
+from ..auth import is_admin
+from ..executors import run_cpu, run_db
+from ..services import exporter
+from ..settings import ADMIN_TOKEN
+from .responses import FastJSONResponse
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    if ADMIN_TOKEN is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not is_admin(x_admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required"
+        )
+
+
+router = APIRouter(
+    prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)]
+)
+
+
+def _file_info(path: Path) -> Dict[str, object]:
+    stat = path.stat()
+    return {
+        "name": path.name,
+        "size": stat.st_size,
+        "created_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(),
+    }
+
+
+def _list_files(list_paths: Callable[[], List[Path]]) -> List[Dict[str, object]]:
+    return [_file_info(path) for path in list_paths()]
+
+
+def _render_profile(path: Path) -> str:
+    output = io.StringIO()
+    pstats.Stats(str(path), stream=output).sort_stats("cumulative").print_stats(40)
+    return output.getvalue()
+
+
+# File system work goes to the db executor and pstats rendering to the CPU one,
+# as in the rest of the API, so none of it runs on the event loop.
+
+
+@router.get("/profiles")
+async def list_profiles() -> FastJSONResponse:
+    return FastJSONResponse(await run_db(_list_files, profiling.list_profiles))
+
+
+@router.get("/profiles/{name}")
+async def download_profile(
+    name: str, fmt: str = Query("pstats", alias="format")
+) -> Response:
+    """The raw pstats file, or with ``format=text`` its 40 costliest calls."""
+    path = await run_db(profiling.get_profile, name)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
+        )
+    if fmt == "text":
+        return PlainTextResponse(await run_cpu(_render_profile, path))
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
+
+
+@router.get("/backups")
+async def list_backups() -> FastJSONResponse:
+    return FastJSONResponse(await run_db(_list_files, exporter.list_backups))
+
+
+@router.post("/backups", status_code=status.HTTP_201_CREATED)
+async def create_backup() -> FastJSONResponse:
+    """Snapshot the live database; writers are not blocked while it is copied."""
+    path = await run_db(exporter.create_backup)
+    return FastJSONResponse(
+        await run_db(_file_info, path), status_code=status.HTTP_201_CREATED
+    )
+
+
+@router.get("/backups/{name}")
+async def download_backup(name: str) -> Response:
+    path = await run_db(exporter.get_backup, name)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Backup not found"
+        )
+    return FileResponse(path, media_type="application/vnd.sqlite3", filename=name)
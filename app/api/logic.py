@@ -1,34 +1,128 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+from typing import List, Optional
 
-from ..logic.chords import propagate_chords
+from fastapi import APIRouter, HTTPException, Response, status
+
+from ..executors import WorkTimeout, run_cpu, run_lyrics
+from ..logic.chords import apply_chord_edits, propagate_chords
 from ..schemas import (
+    ChordBatchPreviewRequest,
+    ChordEditRequest,
+    ChordPreviewDeltaResponse,
     ChordPreviewRequest,
     ChordPreviewResponse,
+    ChordSessionCreateRequest,
+    ChordSessionResponse,
+    LineContent,
     LyricsPrepareRequest,
     LyricsPrepareResponse,
 )
+from ..services import chord_sessions
 from ..services.content import prepare_lyrics
+from .responses import FastJSONResponse
 
 router = APIRouter(prefix="/api", tags=["logic"])
 
 
+async def run_prepare_lyrics(
+    title: str,
+    lyrics: str,
+    existing_content: Optional[List[LineContent]],
+    language: Optional[str],
+) -> tuple[str, List[LineContent], str]:
+    try:
+        return await run_lyrics(
+            prepare_lyrics, title, lyrics, existing_content, language
+        )
+    except WorkTimeout as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
+        ) from exc
+
+
 @router.post("/lyrics/prepare", response_model=LyricsPrepareResponse)
-def prepare_lyrics_endpoint(payload: LyricsPrepareRequest) -> LyricsPrepareResponse:
-    title, content, language = prepare_lyrics(
+async def prepare_lyrics_endpoint(payload: LyricsPrepareRequest) -> FastJSONResponse:
+    title, content, language = await run_prepare_lyrics(
         payload.title, payload.lyrics, payload.existing_content, payload.language
     )
-    return LyricsPrepareResponse(title=title, content=content, language=language)
+    return FastJSONResponse(
+        LyricsPrepareResponse(title=title, content=content, language=language)
+    )
 
 
 @router.post("/chords/preview", response_model=ChordPreviewResponse)
-def preview_chords(payload: ChordPreviewRequest) -> ChordPreviewResponse:
-    updated = propagate_chords(
+async def preview_chords(payload: ChordPreviewRequest) -> FastJSONResponse:
+    updated = await run_cpu(
+        propagate_chords,
         payload.content,
         payload.line_index,
         payload.char_index,
         payload.chord,
         payload.language,
     )
-    return ChordPreviewResponse(content=updated)
+    return FastJSONResponse(ChordPreviewResponse(content=updated))
+
+
+@router.post("/chords/preview/delta", response_model=ChordPreviewDeltaResponse)
+async def preview_chords_delta(payload: ChordPreviewRequest) -> FastJSONResponse:
+    updated = await run_cpu(
+        propagate_chords,
+        payload.content,
+        payload.line_index,
+        payload.char_index,
+        payload.chord,
+        payload.language,
+    )
+    patches = chord_sessions.chord_patches(payload.content, updated)
+    return FastJSONResponse(ChordPreviewDeltaResponse(patches=patches))
+
+
+@router.post("/chords/preview/batch", response_model=ChordPreviewResponse)
+async def preview_chords_batch(payload: ChordBatchPreviewRequest) -> FastJSONResponse:
+    updated = await run_cpu(
+        apply_chord_edits,
+        payload.content,
+        [(edit.line_index, edit.char_index, edit.chord) for edit in payload.edits],
+        payload.language,
+    )
+    return FastJSONResponse(ChordPreviewResponse(content=updated))
+
+
+@router.post(
+    "/chords/sessions",
+    response_model=ChordSessionResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def open_chord_session(payload: ChordSessionCreateRequest) -> FastJSONResponse:
+    session_id = chord_sessions.open_session(payload.content, payload.language)
+    return FastJSONResponse(
+        ChordSessionResponse(session_id=session_id),
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+@router.post(
+    "/chords/sessions/{session_id}/edits", response_model=ChordPreviewDeltaResponse
+)
+async def edit_chord_session(
+    session_id: str, payload: ChordEditRequest
+) -> FastJSONResponse:
+    patches = await run_cpu(
+        chord_sessions.apply_edit,
+        session_id,
+        payload.line_index,
+        payload.char_index,
+        payload.chord,
+    )
+    if patches is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Chord session not found"
+        )
+    return FastJSONResponse(ChordPreviewDeltaResponse(patches=patches))
+
+
+@router.delete("/chords/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def close_chord_session(session_id: str) -> Response:
+    chord_sessions.close_session(session_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from typing import Dict, List, cast
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from .. import metrics
+from ..logic.chords import syllable_cache_stats
+from ..logic.language import language_detection_stats
+from ..services import songs as song_service
+
+router = APIRouter(tags=["system"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _cache_lines() -> List[str]:
+    counts: Dict[str, Dict[str, int]] = {
+        "song_responses": song_service.response_cache_stats(),
+        **syllable_cache_stats(),
+    }
+    language = language_detection_stats()
+    language_hits = cast(int, language["cache_hits"])
+    counts["language_detection"] = {
+        "hits": language_hits,
+        "misses": cast(int, language["calls"]) - language_hits,
+    }
+    hits = {name: stats["hits"] for name, stats in counts.items()}
+    misses = {name: stats["misses"] for name, stats in counts.items()}
+    ratios = {
+        name: hits[name] / (hits[name] + misses[name])
+        for name in counts
+        if hits[name] + misses[name]
+    }
+    fallbacks = cast(Dict[str, float], language["fallbacks"])
+    return [
+        *metrics.gauge_lines(
+            "guitar_cache_hits", "Lookups answered from a cache.", "cache", hits
+        ),
+        *metrics.gauge_lines(
+            "guitar_cache_misses", "Lookups a cache could not answer.", "cache", misses
+        ),
+        *metrics.gauge_lines(
+            "guitar_cache_hit_ratio", "Hits over all lookups.", "cache", ratios
+        ),
+        *metrics.gauge_lines(
+            "guitar_language_fallbacks",
+            "Language detections that fell back to the default language.",
+            "reason",
+            fallbacks,
+        ),
+    ]
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        metrics.render(_cache_lines()), media_type=PROMETHEUS_CONTENT_TYPE
+    )
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from .. import json_codec
+from ..metrics import span
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response that skips ``jsonable_encoder``.
+
+    Pydantic models are encoded by pydantic-core in a single pass and other
+    content goes through ``json_codec`` (orjson when installed). The bytes match
+    what FastAPI's default ``JSONResponse`` would send.
+    """
+
+    @span("api.render_json")
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode("utf-8")
+        return json_codec.dumps(content)
@@ -1,56 +1,258 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+import threading
+from itertools import islice
+from typing import AsyncIterator, List, Optional
 
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+
+from ..executors import WorkTimeout, lyrics_workers, run_cpu, run_db, run_lyrics
 from ..schemas import (
     ChordsUpdateRequest,
     LyricsUpdateRequest,
+    SongBatchRequest,
     SongCreateRequest,
     SongDetail,
-    SongSummary,
+    SongSearchPage,
+    SongSummaryPage,
 )
+from ..services import exporter, importer
 from ..services import songs as song_service
+from ..settings import (
+    EXPORT_FETCH_SIZE,
+    IMPORT_BATCH_SIZE,
+    SEARCH_MAX_PAGE_SIZE,
+    SEARCH_PAGE_SIZE,
+    SONG_LIST_MAX_PAGE_SIZE,
+    SONG_LIST_PAGE_SIZE,
+)
+from .http_cache import body_etag, cache_headers, etag_matches, not_modified
+from .logic import run_prepare_lyrics
+from .responses import FastJSONResponse
 
 router = APIRouter(prefix="/api", tags=["songs"])
 
 
-@router.get("/songs", response_model=list[SongSummary])
-def list_songs() -> list[SongSummary]:
-    return song_service.list_songs()
+@router.get("/songs", response_model=SongSummaryPage)
+async def list_songs(
+    limit: int = Query(SONG_LIST_PAGE_SIZE, ge=1, le=SONG_LIST_MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    try:
+        page = await run_db(song_service.list_songs, limit, after)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+    response = FastJSONResponse(page)
+    etag = body_etag(response.body)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
+    return response
+
+
+@router.get("/songs/search", response_model=SongSearchPage)
+async def search_songs(
+    q: str = Query(..., max_length=200),
+    limit: int = Query(SEARCH_PAGE_SIZE, ge=1, le=SEARCH_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+) -> FastJSONResponse:
+    page = await run_db(song_service.search_songs, q, limit, offset)
+    return FastJSONResponse(page)
+
+
+@router.post("/songs/batch")
+async def show_song_batch(payload: SongBatchRequest) -> StreamingResponse:
+    """Stream the requested songs as NDJSON, one ``SongDetail`` per line."""
+    lines = song_service.iter_song_batch(payload.ids, payload.expand_choruses)
+
+    async def stream() -> AsyncIterator[bytes]:
+        # Each song is built on the DB executor and sent as soon as it is ready.
+        while (line := await run_db(next, lines, None)) is not None:
+            yield line
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+async def _body_lines(request: Request) -> AsyncIterator[bytes]:
+    buffered = b""
+    async for chunk in request.stream():
+        buffered += chunk
+        *lines, buffered = buffered.split(b"\n")
+        for line in lines:
+            yield line
+    if buffered:
+        yield buffered
+
+
+async def _prepare_import(item: importer.ImportItem) -> importer.Prepared:
+    try:
+        return await run_lyrics(importer.prepare_import, item)
+    except WorkTimeout as exc:
+        return importer.ImportFailure(item.source, str(exc))
+
+
+async def _prepare_items(
+    items: List[importer.ImportItem],
+) -> List[importer.Prepared]:
+    workers = lyrics_workers()
+    if workers == 0:
+        # One CPU thread for the whole batch leaves the others to chord edits.
+        return await run_cpu(importer.prepare_all, items)
+    # At most one job per worker: run_lyrics serves callers in turn, so an
+    # interactive request waits behind one import job instead of the batch.
+    limit = asyncio.Semaphore(workers)
+
+    async def prepare(item: importer.ImportItem) -> importer.Prepared:
+        async with limit:
+            return await _prepare_import(item)
+
+    return await asyncio.gather(*(prepare(item) for item in items))
+
+
+async def _import_batch(
+    report: importer.ImportReport, lines: List[bytes], start: int
+) -> None:
+    entries = list(importer.read_ndjson(lines, "line", start))
+    items = [entry for entry in entries if isinstance(entry, importer.ImportItem)]
+    prepared = importer.in_input_order(entries, await _prepare_items(items))
+    await run_db(importer.add_batch, report, prepared)
+
+
+@router.post("/songs/import")
+async def import_songs(request: Request) -> FastJSONResponse:
+    """Import NDJSON songs (``{"title", "lyrics", "language"?}`` per line).
+
+    The body is read as it arrives; every IMPORT_BATCH_SIZE lines are prepared
+    in parallel and stored in one transaction. Songs that fail are listed in
+    the report's ``errors`` by line number and do not stop the import.
+    """
+    report = importer.ImportReport()
+    lines: List[bytes] = []
+    start = 1
+    async for line in _body_lines(request):
+        lines.append(line)
+        if len(lines) >= IMPORT_BATCH_SIZE:
+            await _import_batch(report, lines, start)
+            start += len(lines)
+            lines = []
+    if lines:
+        await _import_batch(report, lines, start)
+    return FastJSONResponse(report.as_dict())
+
+
+@router.get("/songs/export")
+async def export_songs(
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|text)$"),
+) -> StreamingResponse:
+    """Stream the whole library, read a page at a time, as NDJSON or text."""
+    chunks = exporter.iter_export(fmt)
+    # The generator runs on executor threads; the lock keeps a disconnect from
+    # closing it while a thread is still inside it.
+    lock = threading.Lock()
+    closed = False
+
+    def next_chunk() -> bytes:
+        with lock:
+            chunk = b"" if closed else b"".join(islice(chunks, EXPORT_FETCH_SIZE))
+            if closed or not chunk:
+                chunks.close()
+            return chunk
+
+    def close() -> None:
+        nonlocal closed
+        closed = True
+        # If a chunk is being read, next_chunk closes the generator after it.
+        if lock.acquire(blocking=False):
+            try:
+                chunks.close()
+            finally:
+                lock.release()
+
+    async def stream() -> AsyncIterator[bytes]:
+        try:
+            while chunk := await run_db(next_chunk):
+                yield chunk
+        finally:
+            close()
+
+    if fmt == "ndjson":
+        media_type, filename = "application/x-ndjson", "songs.ndjson"
+    else:
+        media_type, filename = "text/plain; charset=utf-8", "songs.txt"
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/songs/{song_id}", response_model=SongDetail)
-def show_song(song_id: int, expand_choruses: bool = False) -> SongDetail:
-    song = song_service.get_song(song_id, expand_choruses=expand_choruses)
+async def show_song(
+    song_id: int,
+    expand_choruses: bool = False,
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    if if_none_match is not None:
+        current_etag = await run_db(
+            song_service.get_song_etag, song_id, expand_choruses
+        )
+        if current_etag is not None and etag_matches(if_none_match, current_etag):
+            return not_modified(current_etag)
+    song = await run_db(song_service.get_encoded_song, song_id, expand_choruses)
     if song is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Song not found"
         )
-    return song
+    return Response(
+        song.body, media_type="application/json", headers=cache_headers(song.etag)
+    )
 
 
 @router.post("/songs", response_model=SongDetail, status_code=status.HTTP_201_CREATED)
-def create_song(payload: SongCreateRequest) -> SongDetail:
-    return song_service.create_song(payload.title, payload.content)
+async def create_song(payload: SongCreateRequest) -> FastJSONResponse:
+    structured = await run_cpu(
+        song_service.structure_new_song, payload.content, payload.language
+    )
+    song = await run_db(song_service.store_new_song, payload.title, structured)
+    return FastJSONResponse(song, status_code=status.HTTP_201_CREATED)
 
 
 @router.put("/songs/{song_id}/lyrics", response_model=SongDetail)
-def update_lyrics(song_id: int, payload: LyricsUpdateRequest) -> SongDetail:
-    updated = song_service.update_song_lyrics(
-        song_id, payload.title, payload.lyrics, payload.existing_content
+async def update_lyrics(song_id: int, payload: LyricsUpdateRequest) -> FastJSONResponse:
+    # Checked first: a missing song should not cost a lyrics worker.
+    exists, stored_language = await run_db(song_service.get_song_language, song_id)
+    if not exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Song not found"
+        )
+    language = payload.language or stored_language
+    title, content, language = await run_prepare_lyrics(
+        payload.title, payload.lyrics, payload.existing_content, language
     )
+    structured = await run_cpu(
+        song_service.structure_prepared_lyrics, content, language
+    )
+    updated = await run_db(song_service.store_song, song_id, title, structured)
     if updated is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Song not found"
         )
-    return updated
+    return FastJSONResponse(updated)
 
 
 @router.put("/songs/{song_id}/chords", response_model=SongDetail)
-def update_chords(song_id: int, payload: ChordsUpdateRequest) -> SongDetail:
-    updated = song_service.update_song_chords(song_id, payload.title, payload.content)
+async def update_chords(song_id: int, payload: ChordsUpdateRequest) -> FastJSONResponse:
+    structured = await run_cpu(
+        song_service.structure_song, payload.content, payload.language
+    )
+    updated = await run_db(song_service.store_song, song_id, payload.title, structured)
     if updated is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Song not found"
         )
-    return updated
+    return FastJSONResponse(updated)
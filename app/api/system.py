@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+
+from .. import startup
+from ..logic.chords import syllable_cache_stats
+from ..logic.language import language_detection_stats
+from ..services import songs as song_service
+from .responses import FastJSONResponse
+
+router = APIRouter(prefix="/api/system", tags=["system"])
+
+
+@router.get("/caches")
+async def cache_stats() -> FastJSONResponse:
+    return FastJSONResponse(
+        {
+            "song_responses": song_service.response_cache_stats(),
+            **syllable_cache_stats(),
+            "language_detection": language_detection_stats(),
+        }
+    )
+
+
+@router.get("/startup")
+async def startup_timings() -> FastJSONResponse:
+    return FastJSONResponse(startup.timings())
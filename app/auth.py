@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import secrets
+from typing import Optional
+
+from .settings import ADMIN_TOKEN
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """Whether ``token`` is the configured ADMIN_TOKEN; never true while unset."""
+    return (
+        ADMIN_TOKEN is not None
+        and token is not None
+        and secrets.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8"))
+    )
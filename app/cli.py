@@ -0,0 +1,147 @@
+"""Command line tools that work on the app's database directly.
+
+``GUITAR_DATA_DIR`` selects the database, as for the server. Every command is
+safe against a database that a server is using: an import batch is one short
+transaction, export reads songs in short pages, and backup copies a snapshot,
+neither blocking writers::
+
+    python -m app.cli import songs.ndjson
+    python -m app.cli import lyrics/ --workers 4
+    cat songs.ndjson | python -m app.cli import -
+    python -m app.cli export --format text --output songs.txt
+    python -m app.cli backup songs-copy.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, closing
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from . import db
+from .executors import warm_process_worker
+from .services import exporter, importer
+
+
+def _entries(source: str) -> Iterator[importer.ImportEntry]:
+    if source == "-":
+        return importer.read_ndjson(sys.stdin, "stdin")
+    path = Path(source)
+    if path.is_dir():
+        return importer.read_text_files(path)
+    return _read_file(path)
+
+
+def _read_file(path: Path) -> Iterator[importer.ImportEntry]:
+    with path.open(encoding="utf-8") as lines:
+        yield from importer.read_ndjson(lines, path.name)
+
+
+def import_command(args: argparse.Namespace) -> int:
+    db.init_db()
+    try:
+        if args.workers > 1:
+            # "spawn" for the same reason as the server's lyrics pool.
+            with ProcessPoolExecutor(
+                max_workers=args.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=warm_process_worker,
+            ) as pool:
+                report = importer.import_songs(
+                    _entries(args.source),
+                    lambda func, items: pool.map(func, items, chunksize=16),
+                )
+        else:
+            report = importer.import_songs(_entries(args.source))
+    finally:
+        db.close_pool()
+    if args.json:
+        print(json.dumps(report.as_dict()))
+    else:
+        print(f"Imported {len(report.ids)} songs")
+        for error in report.errors:
+            print(f"{error.source}: {error.error}", file=sys.stderr)
+    return 1 if report.errors else 0
+
+
+def export_command(args: argparse.Namespace) -> int:
+    db.init_db()
+    with ExitStack() as stack:
+        stack.callback(db.close_pool)
+        output = (
+            stack.enter_context(open(args.output, "wb"))
+            if args.output
+            else sys.stdout.buffer
+        )
+        chunks = stack.enter_context(closing(exporter.iter_export(args.format)))
+        for chunk in chunks:
+            output.write(chunk)
+    return 0
+
+
+def backup_command(args: argparse.Namespace) -> int:
+    db.init_db()
+    try:
+        db.backup(Path(args.destination))
+    finally:
+        db.close_pool()
+    print(f"Wrote {args.destination}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser(
+        "import",
+        help="import songs from NDJSON or a directory of .txt files",
+        description="Import songs. NDJSON lines hold title, lyrics and an "
+        "optional language; .txt files are titled by their name. Lyrics may "
+        "carry inline {chord} notation.",
+    )
+    import_parser.add_argument(
+        "source", help="an .ndjson file, '-' for stdin, or a directory"
+    )
+    import_parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="processes preparing lyrics (default: one per CPU)",
+    )
+    import_parser.add_argument(
+        "--json", action="store_true", help="print the full report as JSON"
+    )
+    import_parser.set_defaults(handler=import_command)
+
+    export_parser = commands.add_parser(
+        "export", help="write every song as NDJSON or inline-chord text"
+    )
+    export_parser.add_argument(
+        "--format", choices=exporter.EXPORT_FORMATS, default="ndjson"
+    )
+    export_parser.add_argument("--output", help="file to write (default: stdout)")
+    export_parser.set_defaults(handler=export_command)
+
+    backup_parser = commands.add_parser(
+        "backup", help="write a consistent copy of the database"
+    )
+    backup_parser.add_argument("destination", help="path of the new database file")
+    backup_parser.set_defaults(handler=backup_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,286 @@
 from __future__ import annotations
 
+import queue
+import re
 import sqlite3
-from contextlib import closing
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Optional
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
 
-from .models import SongRow
-from .settings import DB_PATH, DATA_DIR
+from .metrics import DB_QUERY_SECONDS, span
+from .models import SongRow, SongSummaryRow
+from .settings import (
+    DB_CACHED_STATEMENTS,
+    DB_PATH,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_PRAGMAS,
+    DATA_DIR,
+    SONG_CHANGE_LOG_RETENTION,
+)
 
 
 def _utc_now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+# unicode61 with remove_diacritics folds every Polish letter except "ł", which
+# has no Unicode decomposition, so it is mapped by hand on both the indexed text
+# and the query.
+_SEARCH_FOLD = str.maketrans({"ł": "l", "Ł": "L"})
+_SEARCH_TOKEN_RE = re.compile(r"\w+")
+
+
+def search_fold(text: Optional[str]) -> Optional[str]:
+    if text is None:
+        return None
+    return text.translate(_SEARCH_FOLD)
+
+
+class _ConnectionPool:
+    """Thread-safe pool of SQLite connections to a single database file.
+
+    Connections are opened lazily up to ``size`` and configured once with
+    ``DB_PRAGMAS``; each keeps its own prepared statement cache for its whole
+    lifetime. A connection is only ever used by one thread at a time.
+    """
+
+    def __init__(self, path: Path, size: int) -> None:
+        self.path = path
+        self._size = size
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            cached_statements=DB_CACHED_STATEMENTS,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.create_function("search_fold", 1, search_fold, deterministic=True)
+        for name, value in DB_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value};")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_open = self._opened < self._size
+            if can_open:
+                self._opened += 1
+        if can_open:
+            try:
+                return self._open()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        try:
+            return self._idle.get(timeout=DB_POOL_TIMEOUT_SECONDS)
+        except queue.Empty:
+            raise RuntimeError("Timed out waiting for a database connection") from None
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        if self._closed:
+            conn.close()
+            return
+        self._idle.put(conn)
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+
+
+class _ChangeFeed:
+    """Reports which songs were written since the previous poll, by any process.
+
+    Every write to ``songs`` appends the song id to ``song_changes`` (see the
+    triggers in ``init_db``). ``PRAGMA data_version`` on this feed's own
+    connection only changes when some other connection commits, so an idle
+    poll costs one pragma and no query.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._data_version: Optional[int] = None
+        self._last_seq = 0
+
+    def poll(self) -> Optional[set[int]]:
+        """Return ids changed since the last poll, or ``None`` if unknown.
+
+        ``None`` is returned on the first poll and whenever the log was pruned
+        past the last change seen; callers then drop everything they cached.
+        """
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            data_version = self._conn.execute("PRAGMA data_version;").fetchone()[0]
+            if data_version == self._data_version:
+                return set()
+            first_poll = self._data_version is None
+            self._data_version = data_version
+            rows = self._conn.execute(
+                "SELECT seq, song_id FROM song_changes WHERE seq > ? ORDER BY seq",
+                (self._last_seq,),
+            ).fetchall()
+            if not rows:
+                return None if first_poll else set()
+            missed = rows[0][0] > self._last_seq + 1
+            self._last_seq = rows[-1][0]
+            if first_poll or missed:
+                return None
+            return {song_id for _, song_id in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_POOL: Optional[_ConnectionPool] = None
+_FEED: Optional[_ChangeFeed] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool() -> _ConnectionPool:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None or _POOL.path != DB_PATH:
+            if _POOL is not None:
+                _POOL.close()
+            _POOL = _ConnectionPool(DB_PATH, DB_POOL_SIZE)
+        return _POOL
+
+
+def _get_feed() -> _ChangeFeed:
+    global _FEED
+    with _POOL_LOCK:
+        if _FEED is None or _FEED.path != DB_PATH:
+            if _FEED is not None:
+                _FEED.close()
+            _FEED = _ChangeFeed(DB_PATH)
+        return _FEED
+
+
+def close_pool() -> None:
+    global _POOL, _FEED
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.close()
+            _POOL = None
+        if _FEED is not None:
+            _FEED.close()
+            _FEED = None
+
+
+def poll_song_changes() -> Optional[set[int]]:
+    """Ids of songs written since the previous call; ``None`` means "any"."""
+    return _get_feed().poll()
+
+
+@contextmanager
+def _connection() -> Iterator[sqlite3.Connection]:
+    pool = _get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+# Fills songs_fts from songs rows; the plain lyrics are the "text" of every line
+# in content_json. Callers append the FROM/WHERE clause.
+_INDEX_SONGS_SQL = """
+    INSERT INTO songs_fts (rowid, title, lyrics)
+    SELECT
+        id,
+        search_fold(title),
+        search_fold(
+            (
+                SELECT group_concat(json_extract(value, '$.text'), char(10))
+                FROM json_each(content_json)
+            )
+        )
+"""
+
+
+def _index_song(conn: sqlite3.Connection, song_id: int) -> None:
+    conn.execute("DELETE FROM songs_fts WHERE rowid = ?", (song_id,))
+    conn.execute(f"{_INDEX_SONGS_SQL} FROM songs WHERE id = ?", (song_id,))
+
+
+# Columns added after the first release, with their declarations. ``init_db``
+# adds any that an existing database is missing; the values themselves are
+# backfilled by ``services.songs.backfill_song_metadata``.
+_SONG_MIGRATED_COLUMNS = {
+    "language": "TEXT",
+    "structure_json": "TEXT",
+}
+
+
+def _add_missing_columns(
+    conn: sqlite3.Connection, table: str, columns: dict[str, str]
+) -> None:
+    existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table});")}
+    for name, declaration in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {declaration};")
+
+
+def _create_change_log(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS song_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            song_id INTEGER NOT NULL
+        );
+        """
+    )
+    for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS songs_log_{event.lower()}
+            AFTER {event} ON songs
+            BEGIN
+                INSERT INTO song_changes (song_id) VALUES ({row}.id);
+            END;
+            """
+        )
+    # Recreated on every start so a changed retention setting takes effect.
+    conn.execute("DROP TRIGGER IF EXISTS song_changes_prune;")
+    conn.execute(
+        f"""
+        CREATE TRIGGER song_changes_prune
+        AFTER INSERT ON song_changes
+        BEGIN
+            DELETE FROM song_changes
+            WHERE seq <= NEW.seq - {int(SONG_CHANGE_LOG_RETENTION)};
+        END;
+        """
+    )
+
+
 def init_db() -> None:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(DB_PATH) as conn:
+    with _connection() as conn:
         conn.execute("PRAGMA journal_mode=WAL;")
         conn.execute(
             """
@@ -24,85 +289,362 @@ def init_db() -> None:
                 title TEXT NOT NULL,
                 content_json TEXT NOT NULL,
                 created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
+                updated_at TEXT NOT NULL,
+                language TEXT,
+                structure_json TEXT
             );
             """
         )
+        _add_missing_columns(conn, "songs", _SONG_MIGRATED_COLUMNS)
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_songs_updated_at
+            ON songs (updated_at DESC, id DESC, title);
+            """
+        )
+        has_search_index = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'songs_fts'"
+        ).fetchone()
+        if has_search_index is None:
+            conn.execute(
+                """
+                CREATE VIRTUAL TABLE songs_fts USING fts5(
+                    title,
+                    lyrics,
+                    tokenize = "unicode61 remove_diacritics 2",
+                    prefix = '2 3'
+                );
+                """
+            )
+            conn.execute(f"{_INDEX_SONGS_SQL} FROM songs")
+        _create_change_log(conn)
+        conn.commit()
 
 
-def _get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
+@span("db.fetch_song_summaries", DB_QUERY_SECONDS)
+def fetch_song_summaries(
+    limit: int, after: Optional[tuple[str, int]] = None
+) -> list[SongSummaryRow]:
+    """Return up to ``limit`` songs ordered by ``(updated_at, id)`` descending.
 
-def fetch_songs() -> list[SongRow]:
-    with closing(_get_connection()) as conn:
-        rows = conn.execute(
-            "SELECT id, title, content_json, created_at, updated_at FROM songs ORDER BY updated_at DESC"
-        ).fetchall()
+    ``after`` is the ``(updated_at, id)`` key of the last row of the previous
+    page. The query is answered from ``idx_songs_updated_at`` alone, so
+    ``content_json`` is never read.
+    """
+    with _connection() as conn:
+        if after is None:
+            rows = conn.execute(
+                """
+                SELECT id, title, updated_at FROM songs
+                ORDER BY updated_at DESC, id DESC
+                LIMIT ?
+                """,
+                (limit,),
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                """
+                SELECT id, title, updated_at FROM songs
+                WHERE (updated_at, id) < (?, ?)
+                ORDER BY updated_at DESC, id DESC
+                LIMIT ?
+                """,
+                (after[0], after[1], limit),
+            ).fetchall()
     return [
-        SongRow(
-            id=row["id"],
-            title=row["title"],
-            content_json=row["content_json"],
-            created_at=row["created_at"],
-            updated_at=row["updated_at"],
-        )
+        SongSummaryRow(id=row["id"], title=row["title"], updated_at=row["updated_at"])
         for row in rows
     ]
 
 
-def get_song(song_id: int) -> Optional[SongRow]:
-    with closing(_get_connection()) as conn:
-        row = conn.execute(
-            "SELECT id, title, content_json, created_at, updated_at FROM songs WHERE id = ?",
-            (song_id,),
-        ).fetchone()
-    if row is None:
-        return None
+_SONG_COLUMNS = (
+    "id, title, content_json, created_at, updated_at, language, structure_json"
+)
+
+
+def _row_to_song(row: sqlite3.Row) -> SongRow:
     return SongRow(
         id=row["id"],
         title=row["title"],
         content_json=row["content_json"],
         created_at=row["created_at"],
         updated_at=row["updated_at"],
+        language=row["language"],
+        structure_json=row["structure_json"],
     )
 
 
-def create_song(title: str, content_json: str) -> SongRow:
+@span("db.fetch_songs_page", DB_QUERY_SECONDS)
+def fetch_songs_page(limit: int, after_id: int = 0) -> list[SongRow]:
+    """Up to ``limit`` songs with an id above ``after_id``, by id."""
+    with _connection() as conn:
+        rows = conn.execute(
+            f"SELECT {_SONG_COLUMNS} FROM songs WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit),
+        ).fetchall()
+    return [_row_to_song(row) for row in rows]
+
+
+def iter_songs(batch_size: int) -> Iterator[SongRow]:
+    """Yield every song by id, reading ``batch_size`` rows per query.
+
+    Each page is its own short read that continues after the last id seen, so
+    no snapshot or connection is held while the caller works through a page;
+    however slowly it goes, WAL checkpoints and writers are never held back.
+    Every page is consistent, but the pages are not one snapshot: a song is
+    yielded as it was when its page was read, songs added meanwhile show up
+    if their id is still ahead, and deleted ones are left out.
+    """
+    after_id = 0
+    while rows := fetch_songs_page(batch_size, after_id):
+        yield from rows
+        after_id = rows[-1].id
+
+
+def backup(destination: Path) -> None:
+    """Write a consistent snapshot of the database to ``destination``.
+
+    The copy is made in a single backup step: in WAL mode that is one read
+    transaction, which never blocks writers. Copying in smaller steps would
+    restart from the first page whenever another connection commits, so under
+    steady writes it might never finish. The file appears only when complete.
+    """
+    partial = destination.with_name(f"{destination.name}.partial")
+    partial.unlink(missing_ok=True)
+    source = sqlite3.connect(DB_PATH)
+    try:
+        target = sqlite3.connect(partial)
+        try:
+            source.backup(target)
+            # A standalone copy: no -wal file next to it.
+            target.execute("PRAGMA journal_mode=DELETE;")
+        finally:
+            target.close()
+    finally:
+        source.close()
+    partial.replace(destination)
+
+
+@span("db.get_song", DB_QUERY_SECONDS)
+def get_song(song_id: int) -> Optional[SongRow]:
+    with _connection() as conn:
+        row = conn.execute(
+            f"SELECT {_SONG_COLUMNS} FROM songs WHERE id = ?",
+            (song_id,),
+        ).fetchone()
+    if row is None:
+        return None
+    return _row_to_song(row)
+
+
+@span("db.get_songs", DB_QUERY_SECONDS)
+def get_songs(song_ids: Sequence[int]) -> list[SongRow]:
+    """Rows of the existing songs among ``song_ids``, in no particular order."""
+    if not song_ids:
+        return []
+    placeholders = ", ".join("?" * len(song_ids))
+    with _connection() as conn:
+        rows = conn.execute(
+            f"SELECT {_SONG_COLUMNS} FROM songs WHERE id IN ({placeholders})",
+            tuple(song_ids),
+        ).fetchall()
+    return [_row_to_song(row) for row in rows]
+
+
+@span("db.get_song_updated_at", DB_QUERY_SECONDS)
+def get_song_updated_at(song_id: int) -> Optional[str]:
+    with _connection() as conn:
+        row = conn.execute(
+            "SELECT updated_at FROM songs WHERE id = ?", (song_id,)
+        ).fetchone()
+    if row is None:
+        return None
+    return row["updated_at"]
+
+
+@span("db.get_song_language", DB_QUERY_SECONDS)
+def get_song_language(song_id: int) -> tuple[bool, Optional[str]]:
+    """Whether the song exists, and its stored language if it has one."""
+    with _connection() as conn:
+        row = conn.execute(
+            "SELECT language FROM songs WHERE id = ?", (song_id,)
+        ).fetchone()
+    if row is None:
+        return False, None
+    return True, row["language"]
+
+
+@span("db.create_song", DB_QUERY_SECONDS)
+def create_song(
+    title: str, content_json: str, language: str, structure_json: str
+) -> SongRow:
     now = _utc_now()
-    with closing(_get_connection()) as conn:
-        cursor = conn.execute(
-            """
-            INSERT INTO songs (title, content_json, created_at, updated_at)
-            VALUES (?, ?, ?, ?)
+    with _connection() as conn:
+        row = conn.execute(
+            f"""
+            INSERT INTO songs (
+                title, content_json, created_at, updated_at, language, structure_json
+            )
+            VALUES (?, ?, ?, ?, ?, ?)
+            RETURNING {_SONG_COLUMNS}
             """,
-            (title, content_json, now, now),
-        )
+            (title, content_json, now, now, language, structure_json),
+        ).fetchone()
+        if row is not None:
+            _index_song(conn, row["id"])
         conn.commit()
-        song_id_value = cursor.lastrowid
-        if song_id_value is None:
-            raise RuntimeError("Failed to create song record")
-        song_id = int(song_id_value)
-    created = get_song(song_id)
-    if created is None:
+    if row is None:
         raise RuntimeError("Failed to create song record")
-    return created
+    return _row_to_song(row)
 
 
-def update_song(song_id: int, title: str, content_json: str) -> Optional[SongRow]:
+@span("db.insert_songs", DB_QUERY_SECONDS)
+def insert_songs(rows: Sequence[tuple[str, str, str, str]]) -> list[int]:
+    """Insert ``(title, content_json, language, structure_json)`` rows at once.
+
+    One transaction and one ``executemany``; the new rows are indexed for
+    search by their id range. Returns the new ids in the order of ``rows``.
+    """
+    if not rows:
+        return []
     now = _utc_now()
-    with closing(_get_connection()) as conn:
-        cursor = conn.execute(
+    with _connection() as conn:
+        # IMMEDIATE takes the write lock up front, so no other writer can take
+        # ids between reading the sequence and the insert.
+        conn.execute("BEGIN IMMEDIATE")
+        first_id = _next_song_id(conn)
+        conn.executemany(
             """
+            INSERT INTO songs (
+                title, content_json, created_at, updated_at, language, structure_json
+            )
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (title, content_json, now, now, language, structure_json)
+                for title, content_json, language, structure_json in rows
+            ],
+        )
+        last_id = first_id + len(rows) - 1
+        if _next_song_id(conn) != last_id + 1:
+            conn.rollback()
+            raise RuntimeError("Song ids of a bulk insert were not contiguous")
+        conn.execute(
+            f"{_INDEX_SONGS_SQL} FROM songs WHERE id BETWEEN ? AND ?",
+            (first_id, last_id),
+        )
+        conn.commit()
+    return list(range(first_id, last_id + 1))
+
+
+def _next_song_id(conn: sqlite3.Connection) -> int:
+    # AUTOINCREMENT hands out max(sqlite_sequence.seq, max(id)) + 1.
+    row = conn.execute(
+        """
+        SELECT max(
+            coalesce((SELECT seq FROM sqlite_sequence WHERE name = 'songs'), 0),
+            coalesce((SELECT max(id) FROM songs), 0)
+        ) + 1
+        """
+    ).fetchone()
+    return row[0]
+
+
+@span("db.update_song", DB_QUERY_SECONDS)
+def update_song(
+    song_id: int,
+    title: str,
+    content_json: str,
+    structure_json: str,
+    language: Optional[str] = None,
+) -> Optional[SongRow]:
+    """Overwrite a song; a ``language`` of ``None`` keeps the stored one."""
+    now = _utc_now()
+    with _connection() as conn:
+        row = conn.execute(
+            f"""
             UPDATE songs
-            SET title = ?, content_json = ?, updated_at = ?
+            SET title = ?,
+                content_json = ?,
+                structure_json = ?,
+                language = COALESCE(?, language),
+                updated_at = ?
             WHERE id = ?
+            RETURNING {_SONG_COLUMNS}
+            """,
+            (title, content_json, structure_json, language, now, song_id),
+        ).fetchone()
+        if row is not None:
+            _index_song(conn, song_id)
+        conn.commit()
+    if row is None:
+        return None
+    return _row_to_song(row)
+
+
+@span("db.fetch_songs_missing_metadata", DB_QUERY_SECONDS)
+def fetch_songs_missing_metadata(limit: int, after_id: int = 0) -> list[SongRow]:
+    with _connection() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT {_SONG_COLUMNS} FROM songs
+            WHERE (language IS NULL OR structure_json IS NULL) AND id > ?
+            ORDER BY id
+            LIMIT ?
+            """,
+            (after_id, limit),
+        ).fetchall()
+    return [_row_to_song(row) for row in rows]
+
+
+@span("db.store_song_metadata", DB_QUERY_SECONDS)
+def store_song_metadata(
+    song: SongRow, content_json: str, language: str, structure_json: str
+) -> None:
+    """Backfill derived columns of ``song`` without touching ``updated_at``.
+
+    Nothing is written if the song was saved again since ``song`` was read.
+    """
+    with _connection() as conn:
+        conn.execute(
+            """
+            UPDATE songs
+            SET content_json = ?, language = ?, structure_json = ?
+            WHERE id = ? AND updated_at = ?
             """,
-            (title, content_json, now, song_id),
+            (content_json, language, structure_json, song.id, song.updated_at),
         )
         conn.commit()
-        if cursor.rowcount == 0:
-            return None
-    return get_song(song_id)
+
+
+def _match_expression(query: str) -> Optional[str]:
+    tokens = _SEARCH_TOKEN_RE.findall(search_fold(query) or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+@span("db.search_songs", DB_QUERY_SECONDS)
+def search_songs(
+    query: str, limit: int, offset: int, title_weight: float
+) -> list[SongSummaryRow]:
+    """Rank songs whose title or lyrics contain every word of ``query`` as a prefix."""
+    match = _match_expression(query)
+    if match is None:
+        return []
+    with _connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT songs.id, songs.title, songs.updated_at
+            FROM songs_fts
+            JOIN songs ON songs.id = songs_fts.rowid
+            WHERE songs_fts MATCH ?
+            ORDER BY bm25(songs_fts, ?, 1.0), songs.id
+            LIMIT ? OFFSET ?
+            """,
+            (match, title_weight, limit, offset),
+        ).fetchall()
+    return [
+        SongSummaryRow(id=row["id"], title=row["title"], updated_at=row["updated_at"])
+        for row in rows
+    ]
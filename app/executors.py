@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from .logic.chords import warm_hyphenators
+from .logic.language import warm_language_profiles
+from .settings import (
+    CPU_EXECUTOR_WORKERS,
+    DB_EXECUTOR_WORKERS,
+    LYRICS_PROCESS_TIMEOUT_SECONDS,
+    LYRICS_PROCESS_WORKERS,
+)
+
+T = TypeVar("T")
+
+# Handlers are async and hand blocking work to one of two executors: "db" for
+# calls that mostly wait on sqlite3 and "cpu" for chord and lyrics logic. A
+# burst of hyphenation can then only occupy the CPU executor's few threads
+# instead of every thread a database read could use. Executors are created on
+# first use and shut down with the app.
+
+_SIZES: Dict[str, int] = {"db": DB_EXECUTOR_WORKERS, "cpu": CPU_EXECUTOR_WORKERS}
+_EXECUTORS: Dict[str, ThreadPoolExecutor] = {}
+_LOCK = threading.Lock()
+
+
+class WorkTimeout(RuntimeError):
+    """Raised when offloaded work does not finish within its time limit."""
+
+
+def _executor(name: str) -> ThreadPoolExecutor:
+    with _LOCK:
+        executor = _EXECUTORS.get(name)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=_SIZES[name], thread_name_prefix=f"guitar-{name}"
+            )
+            _EXECUTORS[name] = executor
+        return executor
+
+
+async def _run(name: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    loop = asyncio.get_running_loop()
+    # Like anyio.to_thread, carry the caller's context variables into the call.
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(_executor(name), call)
+
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    return await _run("db", func, *args, **kwargs)
+
+
+async def run_cpu(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    return await _run("cpu", func, *args, **kwargs)
+
+
+def warm_process_worker() -> None:
+    warm_hyphenators()
+    warm_language_profiles()
+
+
+@dataclass
+class _LyricsWorker:
+    """A single-process pool, so a job has a worker to itself.
+
+    Its time limit then only runs while the job does, and a job that overruns
+    can be stopped without touching anyone else's.
+    """
+
+    pool: ProcessPoolExecutor
+    # Completes once the process has spawned and loaded its dictionaries.
+    ready: Future
+
+
+# Idle workers; LYRICS_PROCESS_WORKERS of them exist while the pool is started.
+_IDLE_LYRICS_WORKERS: List[_LyricsWorker] = []
+_LYRICS_STARTED = False
+# Callers waiting for a worker, per event loop.
+_LYRICS_SLOTS: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+
+def _new_lyrics_worker() -> _LyricsWorker:
+    # "spawn" rather than fork: the parent has running threads and open SQLite
+    # connections that a forked child must not inherit.
+    pool = ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=warm_process_worker,
+    )
+    return _LyricsWorker(pool, pool.submit(int))
+
+
+def _stop_lyrics_worker(worker: _LyricsWorker) -> None:
+    # shutdown() lets a running job finish, and an overrunning one would keep
+    # the process busy, so it is terminated. ProcessPoolExecutor only has a
+    # public terminate_workers() from Python 3.14.
+    processes = list((getattr(worker.pool, "_processes", None) or {}).values())
+    worker.pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+def _start_lyrics_workers() -> List[_LyricsWorker]:
+    global _LYRICS_STARTED
+    with _LOCK:
+        if not _LYRICS_STARTED:
+            _IDLE_LYRICS_WORKERS.extend(
+                _new_lyrics_worker() for _ in range(LYRICS_PROCESS_WORKERS)
+            )
+            _LYRICS_STARTED = True
+        return list(_IDLE_LYRICS_WORKERS)
+
+
+def _lyrics_slots() -> asyncio.Semaphore:
+    global _LYRICS_SLOTS
+    loop = asyncio.get_running_loop()
+    with _LOCK:
+        if _LYRICS_SLOTS is None or _LYRICS_SLOTS[0] is not loop:
+            _LYRICS_SLOTS = (loop, asyncio.Semaphore(LYRICS_PROCESS_WORKERS))
+        return _LYRICS_SLOTS[1]
+
+
+def _checkout_lyrics_worker() -> _LyricsWorker:
+    _start_lyrics_workers()
+    with _LOCK:
+        if _IDLE_LYRICS_WORKERS:
+            return _IDLE_LYRICS_WORKERS.pop()
+    # Only when the pool was shut down meanwhile.
+    return _new_lyrics_worker()
+
+
+def _return_lyrics_worker(worker: _LyricsWorker) -> None:
+    with _LOCK:
+        if _LYRICS_STARTED:
+            _IDLE_LYRICS_WORKERS.append(worker)
+            return
+    _stop_lyrics_worker(worker)
+
+
+def lyrics_workers() -> int:
+    """Worker processes behind ``run_lyrics``; 0 when it uses the CPU executor."""
+    return max(LYRICS_PROCESS_WORKERS, 0)
+
+
+def start_process_pool() -> None:
+    """Start every lyrics worker now instead of on the first requests."""
+    if LYRICS_PROCESS_WORKERS <= 0:
+        return
+    for worker in _start_lyrics_workers():
+        worker.ready.result()
+
+
+async def _run_on_worker(
+    worker: _LyricsWorker, func: Callable[..., T], args: Tuple[Any, ...]
+) -> T:
+    # A replacement worker may still be starting; that is not the job's time.
+    await asyncio.wrap_future(worker.ready)
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(
+            loop.run_in_executor(worker.pool, functools.partial(func, *args)),
+            LYRICS_PROCESS_TIMEOUT_SECONDS,
+        )
+    except asyncio.TimeoutError:
+        raise WorkTimeout("Lyrics preparation timed out") from None
+
+
+async def run_lyrics(func: Callable[..., T], *args: Any) -> T:
+    """Run lyrics preparation in a worker process, or on the CPU executor.
+
+    ``func`` and its arguments must be picklable. Calls wait for a free worker
+    first, so ``LYRICS_PROCESS_TIMEOUT_SECONDS`` only counts the job itself; a
+    job that exceeds it raises ``WorkTimeout`` and its worker is replaced. A
+    worker that dies is replaced and the job tried once more on the new one.
+    """
+    if LYRICS_PROCESS_WORKERS <= 0:
+        return await run_cpu(func, *args)
+    async with _lyrics_slots():
+        worker = _checkout_lyrics_worker()
+        try:
+            try:
+                return await _run_on_worker(worker, func, args)
+            except BrokenProcessPool:
+                _stop_lyrics_worker(worker)
+                worker = _new_lyrics_worker()
+                return await _run_on_worker(worker, func, args)
+        except (WorkTimeout, BrokenProcessPool, asyncio.CancelledError):
+            # The process may still be busy with the job: replace it rather
+            # than make the next caller wait behind it.
+            _stop_lyrics_worker(worker)
+            worker = _new_lyrics_worker()
+            raise
+        finally:
+            _return_lyrics_worker(worker)
+
+
+def shutdown_executors() -> None:
+    global _LYRICS_STARTED
+    with _LOCK:
+        executors = list(_EXECUTORS.values())
+        _EXECUTORS.clear()
+        lyrics_workers = list(_IDLE_LYRICS_WORKERS)
+        _IDLE_LYRICS_WORKERS.clear()
+        _LYRICS_STARTED = False
+    for executor in executors:
+        executor.shutdown(wait=True)
+    for worker in lyrics_workers:
+        worker.pool.shutdown(wait=False, cancel_futures=True)
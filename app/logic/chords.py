@@ -1,15 +1,21 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 import re
-from typing import List, Literal, Optional, Tuple
-
-import pyphen
+from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Sequence, Tuple
 
+from ..metrics import span
 from ..schemas import ChordEntry, LineContent
-from ..settings import DEFAULT_LANGUAGE, LANGUAGE_TO_PYPHEN
+from ..settings import (
+    DEFAULT_LANGUAGE,
+    HYPHENATION_CACHE_SIZE,
+    LANGUAGE_TO_PYPHEN,
+    SYLLABLE_CACHE_SIZE,
+)
 
 _WORD_PATTERN = r"[^\W\d_]+"
+_WORD_RE = re.compile(_WORD_PATTERN, flags=re.UNICODE)
 _POLISH_VOWELS = set("aeiouyąęó")
 _VERSE_START_RE = re.compile(r"^\s*\d+\s*\.?\s+")
 _CHORUS_START_RE = re.compile(r"^\s*(ref\s?[.:]|chorus\s*[:.])", re.IGNORECASE)
@@ -39,6 +45,11 @@ class SyllableSpan:
     end: int
 
 
+if TYPE_CHECKING:
+    import pyphen
+
+# pyphen is imported, and each dictionary built, on first use; see
+# ``warm_hyphenators`` and STARTUP_MODE.
 _HYPHENATORS: dict[str, pyphen.Pyphen] = {}
 
 
@@ -47,16 +58,25 @@ def _get_hyphenator(language: str) -> Optional[pyphen.Pyphen]:
     if not lang:
         return None
     if lang not in _HYPHENATORS:
+        import pyphen
+
         _HYPHENATORS[lang] = pyphen.Pyphen(lang=lang)
     return _HYPHENATORS[lang]
 
 
+def warm_hyphenators() -> None:
+    """Load the dictionaries of every supported language ahead of first use."""
+    for language in LANGUAGE_TO_PYPHEN:
+        _get_hyphenator(language)
+
+
 def _normalize_language(language: Optional[str]) -> str:
     if language and language in LANGUAGE_TO_PYPHEN:
         return language
     return DEFAULT_LANGUAGE
 
 
+@span("chords.detect_structure")
 def detect_structure(lines: List[LineContent]) -> List[Block]:
     blocks: List[Block] = []
     current_lines: List[LineContent] = []
@@ -130,32 +150,52 @@ def detect_structure(lines: List[LineContent]) -> List[Block]:
     return final_blocks
 
 
-def apply_structure(lines: List[LineContent]) -> List[LineContent]:
-    updated = [line.model_copy(deep=True) for line in lines]
-    blocks = detect_structure(updated)
+# The structure pipeline is copy-on-write: only lines whose section or chords
+# change are copied, every other line is shared with the input (and an expanded
+# chorus repeats the same line objects). Treat returned lines as read-only.
+
+
+@span("chords.apply_structure")
+def apply_structure(
+    lines: List[LineContent], blocks: Optional[List[Block]] = None
+) -> List[LineContent]:
+    if blocks is None:
+        blocks = detect_structure(lines)
+    updated = list(lines)
     for block in blocks:
         for line_index in range(block.start_line_index, block.end_line_index + 1):
             if 0 <= line_index < len(updated):
-                updated[line_index].section = block.type
+                line = updated[line_index]
+                if line.section != block.type:
+                    updated[line_index] = line.model_copy(
+                        update={"section": block.type}
+                    )
     return updated
 
 
-def expand_chorus_references(lines: List[LineContent]) -> List[LineContent]:
+@span("chords.expand_chorus_references")
+def expand_chorus_references(
+    lines: List[LineContent], blocks: Optional[List[Block]] = None
+) -> List[LineContent]:
     if not lines:
         return []
 
-    structured = apply_structure(lines)
-    blocks = detect_structure(structured)
-    template_lines: Optional[List[LineContent]] = None
+    if blocks is None:
+        blocks = detect_structure(lines)
+    structured = apply_structure(lines, blocks)
+
+    def block_lines(block: Block) -> List[LineContent]:
+        return structured[block.start_line_index : block.end_line_index + 1]
 
+    template_lines: Optional[List[LineContent]] = None
     for block in blocks:
         if block.type != "chorus":
             continue
         non_marker_lines = [
-            line for line in block.lines if not _is_chorus_marker_only(line.text)
+            line for line in block_lines(block) if not _is_chorus_marker_only(line.text)
         ]
         if non_marker_lines:
-            template_lines = [line.model_copy(deep=True) for line in non_marker_lines]
+            template_lines = non_marker_lines
             break
 
     if not template_lines:
@@ -165,47 +205,24 @@ def expand_chorus_references(lines: List[LineContent]) -> List[LineContent]:
     current_index = 0
 
     for block in blocks:
-        while current_index < block.start_line_index:
-            expanded.append(structured[current_index].model_copy(deep=True))
-            current_index += 1
-
+        expanded.extend(structured[current_index : block.start_line_index])
         if block.type != "chorus":
-            for idx in range(block.start_line_index, block.end_line_index + 1):
-                expanded.append(structured[idx].model_copy(deep=True))
-            current_index = block.end_line_index + 1
-            continue
-
-        block_lines = [
-            structured[idx]
-            for idx in range(block.start_line_index, block.end_line_index + 1)
-        ]
-        non_marker_lines = [
-            line for line in block_lines if not _is_chorus_marker_only(line.text)
-        ]
-
-        if non_marker_lines:
-            for line in non_marker_lines:
-                line_copy = line.model_copy(deep=True)
-                line_copy.section = "chorus"
-                expanded.append(line_copy)
+            expanded.extend(block_lines(block))
         else:
-            for line in template_lines:
-                line_copy = line.model_copy(deep=True)
-                line_copy.section = "chorus"
-                expanded.append(line_copy)
-
+            non_marker_lines = [
+                line
+                for line in block_lines(block)
+                if not _is_chorus_marker_only(line.text)
+            ]
+            expanded.extend(non_marker_lines or template_lines)
         current_index = block.end_line_index + 1
 
-    while current_index < len(structured):
-        expanded.append(structured[current_index].model_copy(deep=True))
-        current_index += 1
-
+    expanded.extend(structured[current_index:])
     return expanded
 
 
 def transform_for_syllables(text: str) -> Tuple[str, List[int]]:
-    word_regex = re.compile(_WORD_PATTERN, flags=re.UNICODE)
-    matches = list(word_regex.finditer(text))
+    matches = list(_WORD_RE.finditer(text))
     if not matches:
         return text, list(range(len(text)))
 
@@ -235,24 +252,25 @@ def transform_for_syllables(text: str) -> Tuple[str, List[int]]:
     return "".join(transformed_chars), index_map
 
 
-def get_syllables(text: str, language: Optional[str]) -> List[SyllableSpan]:
-    import re
+@lru_cache(maxsize=HYPHENATION_CACHE_SIZE)
+@span("chords.hyphenate_word (uncached)")
+def _hyphenate_word(word: str, language: str) -> Tuple[str, ...]:
+    hyphenator = _get_hyphenator(language)
+    if hyphenator is None:
+        return (word,)
+    return tuple(hyphenator.inserted(word).split("-"))
 
+
+@lru_cache(maxsize=SYLLABLE_CACHE_SIZE)
+@span("chords.get_syllables (uncached)")
+def _get_syllables_cached(text: str, language: str) -> Tuple[SyllableSpan, ...]:
     syllables: List[SyllableSpan] = []
     transformed_text, index_map = transform_for_syllables(text)
-    word_regex = re.compile(_WORD_PATTERN, flags=re.UNICODE)
-    hyphenator = _get_hyphenator(_normalize_language(language))
 
-    for match in word_regex.finditer(transformed_text):
-        word = match.group(0)
+    for match in _WORD_RE.finditer(transformed_text):
         word_start = match.start()
-        if hyphenator is None:
-            parts = [word]
-        else:
-            parts = hyphenator.inserted(word).split("-")
-
         current_offset = 0
-        for part in parts:
+        for part in _hyphenate_word(match.group(0), language):
             part_start = word_start + current_offset
             part_end = part_start + len(part)
             original_start = index_map[part_start]
@@ -265,7 +283,32 @@ def get_syllables(text: str, language: Optional[str]) -> List[SyllableSpan]:
                 )
             )
             current_offset += len(part)
-    return syllables
+    return tuple(syllables)
+
+
+def get_syllables(text: str, language: Optional[str]) -> Tuple[SyllableSpan, ...]:
+    return _get_syllables_cached(text, _normalize_language(language))
+
+
+def syllable_cache_stats() -> Dict[str, Dict[str, int]]:
+    stats: Dict[str, Dict[str, int]] = {}
+    for name, cached in (
+        ("syllables", _get_syllables_cached),
+        ("hyphenation", _hyphenate_word),
+    ):
+        info = cached.cache_info()
+        stats[name] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "max_size": info.maxsize or 0,
+        }
+    return stats
+
+
+def clear_syllable_caches() -> None:
+    _get_syllables_cached.cache_clear()
+    _hyphenate_word.cache_clear()
 
 
 def get_syllable_info(
@@ -291,6 +334,7 @@ def get_char_index_for_syllable(
     return syllables[syllable_index].start
 
 
+@span("chords.propagate_chords")
 def propagate_chords(
     lines: List[LineContent],
     changed_line_index: int,
@@ -303,10 +347,26 @@ def propagate_chords(
     if changed_line_index < 0 or changed_line_index >= len(lines):
         return lines
 
-    normalized_language = _normalize_language(language)
-    updated = [line.model_copy(deep=True) for line in lines]
-    blocks = detect_structure(updated)
+    updated = list(lines)
+    _propagate_in_place(
+        updated,
+        detect_structure(lines),
+        changed_line_index,
+        changed_char_index,
+        new_chord_value,
+        _normalize_language(language),
+    )
+    return updated
+
 
+def _propagate_in_place(
+    updated: List[LineContent],
+    blocks: List[Block],
+    changed_line_index: int,
+    changed_char_index: int,
+    new_chord_value: Optional[str],
+    normalized_language: str,
+) -> None:
     source_block = next(
         (
             block
@@ -316,11 +376,11 @@ def propagate_chords(
         None,
     )
     if source_block is None:
-        return updated
+        return
 
     same_type_blocks = [block for block in blocks if block.type == source_block.type]
     if not same_type_blocks or same_type_blocks[0] != source_block:
-        return updated
+        return
 
     relative_line_index = changed_line_index - source_block.start_line_index
     source_line_text = updated[changed_line_index].text
@@ -332,7 +392,7 @@ def propagate_chords(
             source_line_text, changed_char_index, normalized_language
         )
         if syllable_index == -1:
-            return updated
+            return
 
     for target_block in same_type_blocks[1:]:
         if relative_line_index >= len(target_block.lines):
@@ -353,13 +413,72 @@ def propagate_chords(
             if target_char_index >= len(target_line.text):
                 continue
 
+        existing = target_line.chords.get(target_char_index)
         chords = dict(target_line.chords)
         if new_chord_value:
+            if (
+                existing is not None
+                and existing.type == "auto"
+                and existing.text == new_chord_value
+            ):
+                continue
             chords[target_char_index] = ChordEntry(text=new_chord_value, type="auto")
         else:
-            existing = chords.get(target_char_index)
-            if existing and existing.type == "auto":
-                del chords[target_char_index]
-        target_line.chords = chords
+            if existing is None or existing.type != "auto":
+                continue
+            del chords[target_char_index]
+        updated[target_abs_line_index] = target_line.model_copy(
+            update={"chords": chords}
+        )
+
+
+def _set_manual_chord_in_place(
+    updated: List[LineContent],
+    line_index: int,
+    char_index: int,
+    chord: Optional[str],
+) -> None:
+    if line_index < 0 or line_index >= len(updated):
+        return
+    line = updated[line_index]
+    chords = dict(line.chords)
+    if chord:
+        chords[char_index] = ChordEntry(text=chord, type="manual")
+    elif chords.pop(char_index, None) is None:
+        return
+    updated[line_index] = line.model_copy(update={"chords": chords})
+
+
+@span("chords.apply_chord_edits")
+def apply_chord_edits(
+    lines: List[LineContent],
+    edits: Sequence[Tuple[int, int, Optional[str]]],
+    language: Optional[str],
+) -> List[LineContent]:
+    """Set each (line_index, char_index, chord) manually and propagate it, in order.
 
+    Chord edits never change line text, so the block structure is detected once
+    for the whole batch and syllables come from the shared syllable cache.
+    """
+    updated = list(lines)
+    if not updated:
+        return updated
+    blocks = detect_structure(updated)
+    normalized_language = _normalize_language(language)
+    for line_index, char_index, chord in edits:
+        if line_index < 0 or line_index >= len(updated):
+            continue
+        _set_manual_chord_in_place(updated, line_index, char_index, chord)
+        _propagate_in_place(
+            updated, blocks, line_index, char_index, chord, normalized_language
+        )
     return updated
+
+
+def changed_line_indices(
+    before: List[LineContent], after: List[LineContent]
+) -> List[int]:
+    # Relies on the copy-on-write pipeline: unchanged lines are the same objects.
+    return [
+        index for index, (old, new) in enumerate(zip(before, after)) if old is not new
+    ]
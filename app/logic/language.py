@@ -1,17 +1,97 @@
 from __future__ import annotations
 
-from langdetect import DetectorFactory, detect
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
 
-from ..settings import DEFAULT_LANGUAGE, SUPPORTED_LANGUAGES
+from ..settings import (
+    DEFAULT_LANGUAGE,
+    LANGUAGE_CACHE_SIZE,
+    LANGUAGE_SAMPLE_CHARS,
+    SUPPORTED_LANGUAGES,
+)
 
-DetectorFactory.seed = 0
+_INLINE_CHORD_RE = re.compile(r"\{[^}]*\}")
 
+# Results keyed by a digest of the sample, with the reason a result fell back
+# to DEFAULT_LANGUAGE ("empty", "undetected" or "unsupported") if it did.
+_CACHE: OrderedDict[bytes, Tuple[str, Optional[str]]] = OrderedDict()
+_LOCK = threading.Lock()
+_STATS: Dict[str, int] = {"calls": 0, "cache_hits": 0}
+_FALLBACKS: Dict[str, int] = {"empty": 0, "undetected": 0, "unsupported": 0}
 
-def detect_language(text: str) -> str:
-    if not text.strip():
-        return DEFAULT_LANGUAGE
+
+def _langdetect() -> Callable[[str], str]:
+    # Imported on first use to keep it out of startup; see STARTUP_MODE.
+    from langdetect import DetectorFactory, detect
+
+    DetectorFactory.seed = 0
+    return detect
+
+
+def warm_language_profiles() -> None:
+    """Load langdetect's n-gram profiles, which ``detect`` does on first call."""
+    _langdetect()
+    from langdetect.detector_factory import init_factory
+
+    init_factory()
+
+
+def _sample(text: str) -> str:
+    """Lyrics without inline chords, cut to ``LANGUAGE_SAMPLE_CHARS`` at a space."""
+    cleaned = " ".join(_INLINE_CHORD_RE.sub("", text).split())
+    if len(cleaned) <= LANGUAGE_SAMPLE_CHARS:
+        return cleaned
+    cut = cleaned.rfind(" ", 0, LANGUAGE_SAMPLE_CHARS)
+    return cleaned[: cut if cut > 0 else LANGUAGE_SAMPLE_CHARS]
+
+
+def _detect(sample: str) -> Tuple[str, Optional[str]]:
+    if not sample:
+        return DEFAULT_LANGUAGE, "empty"
     try:
-        detected = detect(text)
+        detected = _langdetect()(sample)
     except Exception:
-        return DEFAULT_LANGUAGE
-    return detected if detected in SUPPORTED_LANGUAGES else DEFAULT_LANGUAGE
+        return DEFAULT_LANGUAGE, "undetected"
+    if detected not in SUPPORTED_LANGUAGES:
+        return DEFAULT_LANGUAGE, "unsupported"
+    return detected, None
+
+
+def detect_language(text: str) -> str:
+    sample = _sample(text)
+    key = hashlib.blake2b(sample.encode("utf-8"), digest_size=16).digest()
+    with _LOCK:
+        _STATS["calls"] += 1
+        cached = _CACHE.get(key)
+        if cached is not None:
+            _CACHE.move_to_end(key)
+            _STATS["cache_hits"] += 1
+    if cached is None:
+        cached = _detect(sample)
+        with _LOCK:
+            _CACHE[key] = cached
+            while len(_CACHE) > LANGUAGE_CACHE_SIZE:
+                _CACHE.popitem(last=False)
+    language, fallback = cached
+    if fallback is not None:
+        with _LOCK:
+            _FALLBACKS[fallback] += 1
+    return language
+
+
+def language_detection_stats() -> Dict[str, object]:
+    with _LOCK:
+        return {
+            **_STATS,
+            "size": len(_CACHE),
+            "max_size": LANGUAGE_CACHE_SIZE,
+            "fallbacks": dict(_FALLBACKS),
+        }
+
+
+def clear_language_cache() -> None:
+    with _LOCK:
+        _CACHE.clear()
@@ -1,27 +1,79 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import threading
+import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
+from . import IMPORT_STARTED, metrics, profiling, startup
+from .api.admin import router as admin_router
 from .api.logic import router as logic_router
+from .api.metrics import router as metrics_router
 from .api.songs import router as songs_router
-from .db import init_db
-from .settings import BASE_DIR
+from .api.system import router as system_router
+from .db import close_pool, init_db
+from .executors import run_cpu, shutdown_executors, start_process_pool
+from .services.songs import backfill_song_metadata
+from .settings import ADMIN_TOKEN, BASE_DIR, PROFILING_MODE, STARTUP_MODE
+
+logger = logging.getLogger(__name__)
+
+
+def _backfill(stop: threading.Event) -> None:
+    started = time.perf_counter()
+    count = backfill_song_metadata(stop)
+    startup.record("backfill", time.perf_counter() - started)
+    if count:
+        logger.info("backfilled metadata of %d songs", count)
+
+
+def _log_failure(task: asyncio.Future) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("metadata backfill failed", exc_info=task.exception())
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
+    started = time.perf_counter()
     init_db()
+    # Legacy rows are backfilled while the app already serves requests; they
+    # read fine without the derived columns, only slower.
+    stop_backfill = threading.Event()
+    backfill = asyncio.ensure_future(run_cpu(_backfill, stop_backfill))
+    backfill.add_done_callback(_log_failure)
+    if STARTUP_MODE == "prewarm":
+        startup.prewarm()
+    elif STARTUP_MODE != "lazy":
+        raise ValueError(f"Unknown STARTUP_MODE: {STARTUP_MODE!r}")
+    start_process_pool()
+    startup.record("lifespan", time.perf_counter() - started)
     yield
+    stop_backfill.set()
+    # Waits for the CPU executor, so a backfill ends after its current batch.
+    shutdown_executors()
+    close_pool()
 
 
 app = FastAPI(title="Guitar Songs", lifespan=lifespan)
+app.add_middleware(startup.FirstRequestTimer)
+if metrics.ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+# Header requests need ADMIN_TOKEN; without it "header" mode has nothing to do.
+if PROFILING_MODE == "slow" or (PROFILING_MODE == "header" and ADMIN_TOKEN):
+    app.add_middleware(profiling.ProfilingMiddleware)
 
 app.include_router(songs_router)
 app.include_router(logic_router)
+app.include_router(system_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
 
 
 static_dir = BASE_DIR / "static"
 app.mount("/", StaticFiles(directory=static_dir, html=True), name="static")
+
+startup.record("import", time.perf_counter() - IMPORT_STARTED)
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, MutableMapping, Tuple, TypeVar
+
+from .settings import METRICS_ENABLED
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Latency histograms in Prometheus text format. Everything here is off unless
+# METRICS_ENABLED: ``span`` then returns the function it decorates untouched and
+# main.py does not install the middleware, so the only cost is at import time.
+
+ENABLED = METRICS_ENABLED
+
+_DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Tuple[str, ...],
+        buckets: Tuple[float, ...] = _DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        # Per label values: a count per bucket plus one for +Inf, and the sum.
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[label_values] = series
+            series[0][index] += 1
+            series[1][0] += seconds
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = {
+                key: (list(counts), total[0])
+                for key, (counts, total) in self._series.items()
+            }
+        for label_values, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                labels = _labels(self.label_names, label_values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {total:.6f}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "guitar_http_request_duration_seconds",
+    "Time to answer an HTTP request.",
+    ("method", "route", "status"),
+)
+FUNCTION_SECONDS = Histogram(
+    "guitar_function_duration_seconds",
+    "Time spent in instrumented functions.",
+    ("function",),
+)
+DB_QUERY_SECONDS = Histogram(
+    "guitar_db_query_duration_seconds",
+    "Time spent in database calls; the _count series counts them.",
+    ("query",),
+)
+_HISTOGRAMS = (HTTP_REQUEST_SECONDS, FUNCTION_SECONDS, DB_QUERY_SECONDS)
+
+
+def span(name: str, histogram: Histogram = FUNCTION_SECONDS) -> Callable[[F], F]:
+    """Time every call of the decorated function into ``histogram``."""
+
+    def decorate(func: F) -> F:
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, name)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def gauge_lines(
+    name: str, help_text: str, label_name: str, samples: Dict[str, float]
+) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for label_value, value in sorted(samples.items()):
+        lines.append(f"{name}{_labels((label_name,), (label_value,))} {value}")
+    return lines
+
+
+def render(extra: Iterable[str] = ()) -> str:
+    lines: List[str] = []
+    for histogram in _HISTOGRAMS:
+        lines.extend(histogram.render())
+    lines.extend(extra)
+    return "\n".join(lines) + "\n"
+
+
+Scope = MutableMapping[str, Any]
+
+
+class MetricsMiddleware:
+    """Observes the latency of every HTTP request by route template."""
+
+    def __init__(self, app: Callable[..., Any]) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message: MutableMapping[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            # Templates, not raw paths, keep the number of series bounded.
+            template = getattr(route, "path", None) or (
+                "static" if route is not None else "unmatched"
+            )
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, scope["method"], template, str(status)
+            )
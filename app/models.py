@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass(frozen=True)
@@ -10,3 +11,12 @@ class SongRow:
     content_json: str
     created_at: str
     updated_at: str
+    language: Optional[str] = None
+    structure_json: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class SongSummaryRow:
+    id: int
+    title: str
+    updated_at: str
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import cProfile
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, List, MutableMapping, Optional
+
+from .auth import is_admin
+from .settings import (
+    PROFILE_DIR,
+    PROFILE_KEEP,
+    PROFILE_SLOW_SECONDS,
+    PROFILING_MODE,
+)
+
+Scope = MutableMapping[str, Any]
+
+# cProfile on Python 3.12+ hooks sys.monitoring, which is process-wide: only one
+# profiler can run at a time, and it also records every other thread, including
+# the executor threads that do a request's work (and any concurrent request's).
+_PROFILER_LOCK = threading.Lock()
+_NAME_RE = re.compile(r"^[\w.-]+\.prof$")
+
+
+def _profile_name(method: str, path: str, seconds: float) -> str:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    slug = re.sub(r"[^\w]+", "_", path).strip("_") or "root"
+    return f"{stamp}-{method}-{slug[:60]}-{round(seconds * 1000)}ms.prof"
+
+
+def list_profiles() -> List[Path]:
+    """Stored profiles, newest first."""
+    if not PROFILE_DIR.is_dir():
+        return []
+    return sorted(
+        (path for path in PROFILE_DIR.iterdir() if _NAME_RE.match(path.name)),
+        reverse=True,
+    )
+
+
+def get_profile(name: str) -> Optional[Path]:
+    if not _NAME_RE.match(name):
+        return None
+    path = PROFILE_DIR / name
+    return path if path.is_file() else None
+
+
+def _store(profiler: cProfile.Profile, name: str) -> None:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(PROFILE_DIR / name)
+    for stale in list_profiles()[PROFILE_KEEP:]:
+        stale.unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """Runs cProfile around a request and keeps the result in ``PROFILE_DIR``.
+
+    A request is profiled when an admin asks for it with ``X-Profile: 1`` and
+    ``X-Admin-Token``, or, with PROFILING_MODE "slow", when it is an API request
+    and no other profile is running; then it is only kept if it took longer
+    than PROFILE_SLOW_SECONDS. Requested profiles are named in the
+    ``X-Profile-Name`` response header.
+    """
+
+    def __init__(self, app: Callable[..., Any]) -> None:
+        self.app = app
+
+    def _requested(self, scope: Scope) -> bool:
+        wanted = False
+        token: Optional[str] = None
+        for key, value in scope["headers"]:
+            if key == b"x-profile":
+                wanted = value == b"1"
+            elif key == b"x-admin-token":
+                token = value.decode("latin-1")
+        return wanted and is_admin(token)
+
+    async def __call__(self, scope: Scope, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        requested = self._requested(scope)
+        automatic = PROFILING_MODE == "slow" and scope["path"].startswith("/api/")
+        if not (requested or automatic) or not _PROFILER_LOCK.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self._profile(scope, receive, send, requested)
+        finally:
+            _PROFILER_LOCK.release()
+
+    async def _profile(
+        self, scope: Scope, receive: Any, send: Any, requested: bool
+    ) -> None:
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        # The name carries the duration, so a requested profile is named only
+        # when its response starts.
+        name: Optional[str] = None
+
+        async def send_with_name(message: MutableMapping[str, Any]) -> None:
+            nonlocal name
+            if requested and message["type"] == "http.response.start":
+                name = _profile_name(
+                    scope["method"], scope["path"], time.perf_counter() - started
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-name", name.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (a debugger, coverage) already owns the hooks.
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send_with_name)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - started
+            if name is None and elapsed >= PROFILE_SLOW_SECONDS:
+                name = _profile_name(scope["method"], scope["path"], elapsed)
+            if name is not None:
+                _store(profiler, name)
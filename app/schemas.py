@@ -1,12 +1,36 @@
 from __future__ import annotations
 
-from typing import Dict, List, Literal, Optional, cast
+from typing import Annotated, Dict, List, Literal, Optional, cast
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    ConfigDict,
+    Field,
+    ValidationInfo,
+    field_validator,
+)
+
+from .settings import SONG_BATCH_MAX_SIZE, SUPPORTED_LANGUAGES
 
 ChordType = Literal["manual", "auto"]
 
 
+def check_language(value: Optional[str]) -> Optional[str]:
+    if value is not None and value not in SUPPORTED_LANGUAGES:
+        supported = ", ".join(SUPPORTED_LANGUAGES)
+        raise ValueError(f"Unsupported language {value!r}; use one of {supported}")
+    return value
+
+
+# Languages that are stored with a song; detection runs again only without one.
+StoredLanguage = Annotated[Optional[str], AfterValidator(check_language)]
+
+# Validation context flag for content produced by ``serialize_content``: chords
+# are already in canonical form, so ``LineContent`` skips normalizing them.
+TRUSTED_CONTENT_CONTEXT: Dict[str, bool] = {"trusted_content": True}
+
+
 class ChordEntry(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -23,7 +47,9 @@ class LineContent(BaseModel):
 
     @field_validator("chords", mode="before")
     @classmethod
-    def normalize_chords(cls, value: object) -> Dict[int, ChordEntry]:
+    def normalize_chords(cls, value: object, info: ValidationInfo) -> object:
+        if info.context is not None and info.context.get("trusted_content"):
+            return value
         if value is None:
             return {}
         if not isinstance(value, dict):
@@ -64,6 +90,20 @@ class SongSummary(BaseModel):
     updated_at: str
 
 
+class SongSummaryPage(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    items: List[SongSummary]
+    next_cursor: Optional[str] = None
+
+
+class SongSearchPage(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    items: List[SongSummary]
+    next_offset: Optional[int] = None
+
+
 class SongDetail(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -72,6 +112,14 @@ class SongDetail(BaseModel):
     content: List[LineContent]
     created_at: str
     updated_at: str
+    language: Optional[str] = None
+
+
+class SongBatchRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    ids: List[int] = Field(min_length=1, max_length=SONG_BATCH_MAX_SIZE)
+    expand_choruses: bool = False
 
 
 class LyricsPrepareRequest(BaseModel):
@@ -107,11 +155,54 @@ class ChordPreviewResponse(BaseModel):
     content: List[LineContent]
 
 
+class ChordPatch(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    line_index: int
+    chords: Dict[int, ChordEntry]
+
+
+class ChordPreviewDeltaResponse(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    patches: List[ChordPatch]
+
+
+class ChordSessionCreateRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    content: List[LineContent]
+    language: Optional[str] = None
+
+
+class ChordSessionResponse(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    session_id: str
+
+
+class ChordEditRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    line_index: int
+    char_index: int
+    chord: Optional[str] = None
+
+
+class ChordBatchPreviewRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    content: List[LineContent]
+    edits: List[ChordEditRequest]
+    language: Optional[str] = None
+
+
 class SongCreateRequest(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     title: str
     content: List[LineContent]
+    language: StoredLanguage = None
 
 
 class LyricsUpdateRequest(BaseModel):
@@ -120,7 +211,7 @@ class LyricsUpdateRequest(BaseModel):
     title: str
     lyrics: str
     existing_content: Optional[List[LineContent]] = None
-    language: Optional[str] = None
+    language: StoredLanguage = None
 
 
 class ChordsUpdateRequest(BaseModel):
@@ -128,3 +219,4 @@ class ChordsUpdateRequest(BaseModel):
 
     title: str
     content: List[LineContent]
+    language: StoredLanguage = None
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from ..logic.chords import apply_chord_edits, changed_line_indices
+from ..schemas import ChordPatch, LineContent
+from ..settings import CHORD_SESSION_LIMIT, CHORD_SESSION_TTL_SECONDS
+
+# Editing sessions keep the song being edited in this worker's memory so the
+# chord editor can send single edits instead of the whole song. They are
+# bounded (least recently used first) and expire; a client that gets "not
+# found" (expired, evicted, or handled by another worker) opens a new one.
+
+
+@dataclass
+class _Session:
+    content: List[LineContent]
+    language: Optional[str]
+    touched_at: float
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+_SESSIONS: OrderedDict[str, _Session] = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def _expire(now: float) -> None:
+    while _SESSIONS:
+        session_id, session = next(iter(_SESSIONS.items()))
+        if now - session.touched_at < CHORD_SESSION_TTL_SECONDS:
+            return
+        del _SESSIONS[session_id]
+
+
+def chord_patches(
+    before: List[LineContent], after: List[LineContent]
+) -> List[ChordPatch]:
+    return [
+        ChordPatch(line_index=index, chords=after[index].chords)
+        for index in changed_line_indices(before, after)
+    ]
+
+
+def open_session(content: List[LineContent], language: Optional[str]) -> str:
+    session_id = secrets.token_urlsafe(16)
+    now = time.monotonic()
+    with _LOCK:
+        _expire(now)
+        _SESSIONS[session_id] = _Session(content, language, now)
+        while len(_SESSIONS) > CHORD_SESSION_LIMIT:
+            _SESSIONS.popitem(last=False)
+    return session_id
+
+
+def apply_edit(
+    session_id: str, line_index: int, char_index: int, chord: Optional[str]
+) -> Optional[List[ChordPatch]]:
+    now = time.monotonic()
+    with _LOCK:
+        _expire(now)
+        session = _SESSIONS.get(session_id)
+        if session is None:
+            return None
+        session.touched_at = now
+        _SESSIONS.move_to_end(session_id)
+    with session.lock:
+        before = session.content
+        after = apply_chord_edits(
+            before, [(line_index, char_index, chord)], session.language
+        )
+        session.content = after
+    return chord_patches(before, after)
+
+
+def close_session(session_id: str) -> None:
+    with _LOCK:
+        _SESSIONS.pop(session_id, None)
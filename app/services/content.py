@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import re
-from typing import List, Optional
+from typing import List, Optional, Sequence
 
-from ..logic.chords import SyllableSpan, apply_structure, get_syllables
+from pydantic import TypeAdapter
+
+from .. import json_codec
+from ..logic.chords import Block, SyllableSpan, apply_structure, get_syllables
 from ..logic.language import detect_language
-from ..schemas import ChordEntry, LineContent
+from ..metrics import span
+from ..schemas import TRUSTED_CONTENT_CONTEXT, ChordEntry, LineContent
 
 _INLINE_CHORD_RE = re.compile(r"\{([^}]+)\}")
+_CONTENT_ADAPTER = TypeAdapter(List[LineContent])
 
 
 def extract_inline_chords(
@@ -72,10 +78,21 @@ def _extract_inline_chords_from_line(
     return cleaned_line, chords
 
 
+def render_inline_lyrics(lines: List[LineContent]) -> str:
+    """The inverse of ``extract_inline_chords``: ``{chord}`` before its position."""
+    rendered = []
+    for line in lines:
+        text = line.text
+        for index in sorted(line.chords, reverse=True):
+            text = f"{text[:index]}{{{line.chords[index].text}}}{text[index:]}"
+        rendered.append(text)
+    return "\n".join(rendered)
+
+
 def _resolve_inline_chord_index(
     clean_index: int,
     text: str,
-    syllables: list[SyllableSpan],
+    syllables: Sequence[SyllableSpan],
 ) -> int:
     if clean_index >= len(text):
         return len(text)
@@ -91,6 +108,7 @@ def _resolve_inline_chord_index(
     return len(text)
 
 
+@span("content.build_content_from_lyrics")
 def build_content_from_lyrics(
     lyrics: str,
     existing_content: Optional[List[LineContent]],
@@ -112,6 +130,7 @@ def build_content_from_lyrics(
     return apply_structure(content)
 
 
+@span("content.prepare_lyrics")
 def prepare_lyrics(
     title: str,
     lyrics: str,
@@ -123,7 +142,10 @@ def prepare_lyrics(
     return title, content, detected_language
 
 
+@span("content.serialize_content")
 def serialize_content(lines: List[LineContent]) -> str:
+    # Stays on the stdlib (C) encoder: stored rows use its ", "/": " separators
+    # and new rows must remain byte-identical to them.
     payload = []
     for line in lines:
         chords = {
@@ -140,8 +162,61 @@ def serialize_content(lines: List[LineContent]) -> str:
     return json.dumps(payload, ensure_ascii=False)
 
 
+@span("content.deserialize_content")
 def deserialize_content(content_json: str) -> List[LineContent]:
-    raw = json.loads(content_json)
+    raw = json_codec.loads(content_json)
     if not isinstance(raw, list):
         raise ValueError("content_json must be a list")
     return [LineContent.model_validate(item) for item in raw]
+
+
+@span("content.deserialize_stored_content")
+def deserialize_stored_content(content_json: str) -> List[LineContent]:
+    """Decode ``content_json`` written by ``serialize_content`` to our database.
+
+    pydantic-core parses and type-checks the JSON in one pass and the Python
+    chord normalization is skipped; API payloads must use the validated path.
+    """
+    return _CONTENT_ADAPTER.validate_json(content_json, context=TRUSTED_CONTENT_CONTEXT)
+
+
+def lyrics_text(lines: List[LineContent]) -> str:
+    return "\n".join(line.text for line in lines)
+
+
+def _block_hash(content_str: str) -> str:
+    return hashlib.sha1(content_str.encode("utf-8")).hexdigest()[:16]
+
+
+def serialize_structure(blocks: List[Block]) -> str:
+    payload = [
+        {
+            "start": block.start_line_index,
+            "end": block.end_line_index,
+            "type": block.type,
+            "hash": _block_hash(block.content_str),
+        }
+        for block in blocks
+    ]
+    return json.dumps(payload)
+
+
+def deserialize_structure(structure_json: str, lines: List[LineContent]) -> List[Block]:
+    raw = json_codec.loads(structure_json)
+    if not isinstance(raw, list):
+        raise ValueError("structure_json must be a list")
+    blocks: List[Block] = []
+    for item in raw:
+        start = int(item["start"])
+        end = int(item["end"])
+        block_lines = lines[start : end + 1]
+        blocks.append(
+            Block(
+                start_line_index=start,
+                end_line_index=end,
+                lines=block_lines,
+                content_str="\n".join(line.text.strip() for line in block_lines),
+                type="chorus" if item["type"] == "chorus" else "verse",
+            )
+        )
+    return blocks
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from .. import db, json_codec
+from ..models import SongRow
+from ..settings import BACKUP_DIR, BACKUP_KEEP, EXPORT_FETCH_SIZE
+from .content import deserialize_stored_content, render_inline_lyrics
+
+# Whole-library export, streamed in short id-ordered pages, and backups made
+# with SQLite's online backup API. Both are safe while the app is writing.
+
+EXPORT_FORMATS = ("ndjson", "text")
+_BACKUP_NAME_RE = re.compile(r"^songs-\d{8}T\d{12}Z\.db$")
+
+
+def _ndjson_line(row: SongRow, lyrics: str) -> bytes:
+    meta = json_codec.dumps(
+        {
+            "id": row.id,
+            "title": row.title,
+            "language": row.language,
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
+            "lyrics": lyrics,
+        }
+    )
+    # content_json is already JSON; splice it in instead of re-encoding it.
+    return meta[:-1] + b',"content":' + row.content_json.encode("utf-8") + b"}\n"
+
+
+def _text_block(row: SongRow, lyrics: str) -> bytes:
+    return f"# {row.title}\n\n{lyrics}\n\n".encode("utf-8")
+
+
+def iter_export(format: str = "ndjson") -> Iterator[bytes]:
+    """Every song, one chunk each, in id order.
+
+    "ndjson" lines carry the stored content plus ``lyrics`` with inline
+    ``{chord}`` notation, so they can be fed back to the importer; "text" is a
+    ``# title`` heading followed by those lyrics. Songs are read a page at a
+    time, so each one is exported as it was when its page was read.
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {format!r}")
+    encode = _ndjson_line if format == "ndjson" else _text_block
+    for row in db.iter_songs(EXPORT_FETCH_SIZE):
+        lyrics = render_inline_lyrics(deserialize_stored_content(row.content_json))
+        yield encode(row, lyrics)
+
+
+def create_backup() -> Path:
+    """Snapshot the database into ``BACKUP_DIR``, keeping the newest few."""
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    path = BACKUP_DIR / f"songs-{stamp}.db"
+    db.backup(path)
+    for stale in list_backups()[BACKUP_KEEP:]:
+        stale.unlink(missing_ok=True)
+    return path
+
+
+def list_backups() -> List[Path]:
+    """Stored backups, newest first."""
+    if not BACKUP_DIR.is_dir():
+        return []
+    return sorted(
+        (path for path in BACKUP_DIR.iterdir() if _BACKUP_NAME_RE.match(path.name)),
+        reverse=True,
+    )
+
+
+def get_backup(name: str) -> Optional[Path]:
+    if not _BACKUP_NAME_RE.match(name):
+        return None
+    path = BACKUP_DIR / name
+    return path if path.is_file() else None
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from .. import db
+from ..logic.chords import detect_structure
+from ..logic.language import detect_language
+from ..schemas import check_language
+from ..settings import IMPORT_BATCH_SIZE
+from .content import build_content_from_lyrics, serialize_content, serialize_structure
+
+# Bulk import: songs arrive as NDJSON lines ({"title", "lyrics", "language"?},
+# lyrics with inline {chord} notation) or as .txt files titled by their name.
+# Preparation is CPU work that may run in worker processes; each batch of
+# prepared songs is then stored in a single transaction.
+
+
+@dataclass(frozen=True)
+class ImportItem:
+    source: str
+    title: str
+    lyrics: str
+    language: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ImportFailure:
+    source: str
+    error: str
+
+
+@dataclass(frozen=True)
+class PreparedSong:
+    source: str
+    title: str
+    content_json: str
+    language: str
+    structure_json: str
+
+
+@dataclass
+class ImportReport:
+    ids: List[int] = field(default_factory=list)
+    errors: List[ImportFailure] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "imported": len(self.ids),
+            "ids": self.ids,
+            "errors": [
+                {"source": error.source, "error": error.error} for error in self.errors
+            ],
+        }
+
+
+ImportEntry = Union[ImportItem, ImportFailure]
+Prepared = Union[PreparedSong, ImportFailure]
+
+
+def parse_import_line(line: Union[str, bytes], source: str) -> ImportItem:
+    try:
+        data = json.loads(line)
+    except ValueError as exc:
+        raise ValueError(f"Invalid JSON: {exc}") from None
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    title = data.get("title")
+    lyrics = data.get("lyrics")
+    language = data.get("language")
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError("title must be a non-empty string")
+    if not isinstance(lyrics, str):
+        raise ValueError("lyrics must be a string")
+    if language is not None and not isinstance(language, str):
+        raise ValueError("language must be a string")
+    return ImportItem(source, title, lyrics, check_language(language or None))
+
+
+def read_ndjson(
+    lines: Iterable[Union[str, bytes]], name: str, start: int = 1
+) -> Iterator[ImportEntry]:
+    """Parse NDJSON lines; a bad line becomes a failure named ``name:line``."""
+    for number, line in enumerate(lines, start=start):
+        if not line.strip():
+            continue
+        source = f"{name}:{number}"
+        try:
+            yield parse_import_line(line, source)
+        except ValueError as exc:
+            yield ImportFailure(source, str(exc))
+
+
+def read_text_files(directory: Path) -> Iterator[ImportEntry]:
+    """One song per ``*.txt`` file in ``directory``, titled by the file name."""
+    for path in sorted(directory.glob("*.txt")):
+        try:
+            lyrics = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError) as exc:
+            yield ImportFailure(path.name, str(exc))
+            continue
+        yield ImportItem(path.name, path.stem, lyrics)
+
+
+def prepare_import(item: ImportItem) -> Prepared:
+    """Build a song's stored columns; runs in worker processes, so module-level."""
+    try:
+        language = item.language or detect_language(item.lyrics)
+        content = build_content_from_lyrics(item.lyrics, None, language)
+        return PreparedSong(
+            item.source,
+            item.title,
+            serialize_content(content),
+            language,
+            serialize_structure(detect_structure(content)),
+        )
+    except Exception as exc:
+        # Reported against this song only; the rest of the batch goes on.
+        return ImportFailure(item.source, f"{type(exc).__name__}: {exc}")
+
+
+def store_prepared(songs: Sequence[PreparedSong]) -> List[int]:
+    # New ids cannot be in the response cache, so there is nothing to invalidate.
+    return db.insert_songs(
+        [
+            (song.title, song.content_json, song.language, song.structure_json)
+            for song in songs
+        ]
+    )
+
+
+def prepare_all(items: Iterable[ImportItem]) -> List[Prepared]:
+    return [prepare_import(item) for item in items]
+
+
+def in_input_order(
+    entries: Sequence[ImportEntry], prepared: Iterable[Prepared]
+) -> List[Prepared]:
+    """Put ``prepared`` (one per ``ImportItem``) back among the failed entries."""
+    results = iter(prepared)
+    return [
+        entry if isinstance(entry, ImportFailure) else next(results)
+        for entry in entries
+    ]
+
+
+def add_batch(report: ImportReport, prepared: Iterable[Prepared]) -> None:
+    """Store the prepared songs of one batch and record failures in ``report``."""
+    songs: List[PreparedSong] = []
+    for result in prepared:
+        if isinstance(result, ImportFailure):
+            report.errors.append(result)
+        else:
+            songs.append(result)
+    if songs:
+        report.ids.extend(store_prepared(songs))
+
+
+def batched(
+    entries: Iterable[ImportEntry], size: int = IMPORT_BATCH_SIZE
+) -> Iterator[List[ImportEntry]]:
+    batch: List[ImportEntry] = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_songs(
+    entries: Iterable[ImportEntry],
+    map_func: Callable[..., Iterable[Prepared]] = map,
+) -> ImportReport:
+    """Prepare and store ``entries`` batch by batch.
+
+    ``map_func`` runs ``prepare_import`` over a batch, e.g. a process pool's
+    ``map``; results are stored in input order.
+    """
+    report = ImportReport()
+    for batch in batched(entries):
+        items = [entry for entry in batch if isinstance(entry, ImportItem)]
+        add_batch(report, in_input_order(batch, map_func(prepare_import, items)))
+    return report
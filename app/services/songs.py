@@ -1,84 +1,415 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import base64
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from .. import db
-from ..logic.chords import apply_structure, expand_chorus_references
-from ..schemas import LineContent, SongDetail, SongSummary
-from .content import build_content_from_lyrics, deserialize_content, serialize_content
+from .. import db, json_codec
+from ..logic.chords import apply_structure, detect_structure, expand_chorus_references
+from ..logic.language import detect_language
+from ..metrics import span
+from ..models import SongRow
+from ..schemas import (
+    LineContent,
+    SongDetail,
+    SongSearchPage,
+    SongSummary,
+    SongSummaryPage,
+)
+from ..settings import SEARCH_TITLE_WEIGHT, SONG_RESPONSE_CACHE_MAX_BYTES
+from .content import (
+    deserialize_content,
+    deserialize_stored_content,
+    deserialize_structure,
+    lyrics_text,
+    serialize_content,
+    serialize_structure,
+)
 
+logger = logging.getLogger(__name__)
 
-def list_songs() -> List[SongSummary]:
-    rows = db.fetch_songs()
-    return [
-        SongSummary(id=row.id, title=row.title, updated_at=row.updated_at)
-        for row in rows
-    ]
+_BACKFILL_BATCH_SIZE = 200
 
+_ResponseKey = Tuple[int, bool]
 
-def get_song(song_id: int, expand_choruses: bool = False) -> Optional[SongDetail]:
-    row = db.get_song(song_id)
-    if row is None:
-        return None
-    content = deserialize_content(row.content_json)
-    if expand_choruses:
-        structured = expand_chorus_references(content)
-    else:
-        structured = apply_structure(content)
-    return SongDetail(
-        id=row.id,
-        title=row.title,
-        content=structured,
-        created_at=row.created_at,
-        updated_at=row.updated_at,
+
+@dataclass(frozen=True)
+class EncodedSong:
+    body: bytes
+    etag: str
+
+
+class _ResponseCache:
+    """LRU of encoded ``SongDetail`` bodies keyed by ``(id, expand_choruses)``.
+
+    Entries are trusted without asking the database for the song's version:
+    local writes drop them directly and writes from other workers are picked
+    up from ``db.poll_song_changes`` before every lookup. ``epoch`` changes on
+    every invalidation, so a body rendered from a row read before a concurrent
+    write is not stored. The total size of the bodies is kept under
+    ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[_ResponseKey, EncodedSong] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: _ResponseKey) -> Optional[EncodedSong]:
+        with self._lock:
+            song = self._entries.get(key)
+            if song is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return song
+
+    def peek(self, key: _ResponseKey) -> Optional[EncodedSong]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: _ResponseKey, song: EncodedSong, epoch: int) -> None:
+        if len(song.body) > self.max_bytes:
+            return
+        with self._lock:
+            if epoch != self.epoch:
+                return
+            self._remove(key)
+            self._entries[key] = song
+            self._size += len(song.body)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, song_ids: Iterable[int]) -> None:
+        with self._lock:
+            self.epoch += 1
+            for song_id in song_ids:
+                for expand_choruses in (False, True):
+                    if self._remove((song_id, expand_choruses)):
+                        self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.epoch += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: _ResponseKey) -> bool:
+        song = self._entries.pop(key, None)
+        if song is None:
+            return False
+        self._size -= len(song.body)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_RESPONSE_CACHE = _ResponseCache(SONG_RESPONSE_CACHE_MAX_BYTES)
+
+
+def sync_song_changes() -> None:
+    """Drop cached responses of songs written by any worker since the last call."""
+    changed = db.poll_song_changes()
+    if changed is None:
+        _RESPONSE_CACHE.clear()
+    elif changed:
+        _RESPONSE_CACHE.invalidate(changed)
+
+
+def response_cache_stats() -> Dict[str, int]:
+    return _RESPONSE_CACHE.stats()
+
+
+def clear_response_cache() -> None:
+    _RESPONSE_CACHE.clear()
+
+
+def _encode_cursor(updated_at: str, song_id: int) -> str:
+    raw = f"{updated_at}|{song_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        updated_at, song_id = raw.rsplit("|", 1)
+        return updated_at, int(song_id)
+    except (ValueError, UnicodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def list_songs(limit: int, after: Optional[str] = None) -> SongSummaryPage:
+    key = _decode_cursor(after) if after else None
+    rows = db.fetch_song_summaries(limit + 1, key)
+    next_cursor: Optional[str] = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _encode_cursor(last.updated_at, last.id)
+    return SongSummaryPage(
+        items=[
+            SongSummary(id=row.id, title=row.title, updated_at=row.updated_at)
+            for row in rows
+        ],
+        next_cursor=next_cursor,
     )
 
 
-def create_song(title: str, content: List[LineContent]) -> SongDetail:
-    structured = apply_structure(content)
-    content_json = serialize_content(structured)
-    row = db.create_song(title, content_json)
-    return SongDetail(
-        id=row.id,
-        title=row.title,
-        content=structured,
-        created_at=row.created_at,
-        updated_at=row.updated_at,
+def search_songs(query: str, limit: int, offset: int = 0) -> SongSearchPage:
+    rows = db.search_songs(query, limit + 1, offset, SEARCH_TITLE_WEIGHT)
+    next_offset: Optional[int] = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_offset = offset + limit
+    return SongSearchPage(
+        items=[
+            SongSummary(id=row.id, title=row.title, updated_at=row.updated_at)
+            for row in rows
+        ],
+        next_offset=next_offset,
     )
 
 
-def update_song_lyrics(
-    song_id: int,
-    title: str,
-    lyrics: str,
-    existing_content: Optional[List[LineContent]],
-) -> Optional[SongDetail]:
-    content = build_content_from_lyrics(lyrics, existing_content)
-    content_json = serialize_content(content)
-    row = db.update_song(song_id, title, content_json)
-    if row is None:
+def song_etag(song_id: int, updated_at: str, expand_choruses: bool) -> str:
+    key = f"{song_id}|{updated_at}|{int(expand_choruses)}"
+    return '"' + hashlib.sha1(key.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def get_song_etag(song_id: int, expand_choruses: bool) -> Optional[str]:
+    sync_song_changes()
+    cached = _RESPONSE_CACHE.peek((song_id, expand_choruses))
+    if cached is not None:
+        return cached.etag
+    updated_at = db.get_song_updated_at(song_id)
+    if updated_at is None:
         return None
+    return song_etag(song_id, updated_at, expand_choruses)
+
+
+def _song_detail(row: SongRow, content: List[LineContent]) -> SongDetail:
     return SongDetail(
         id=row.id,
         title=row.title,
         content=content,
         created_at=row.created_at,
         updated_at=row.updated_at,
+        language=row.language,
     )
 
 
-def update_song_chords(
-    song_id: int, title: str, content: List[LineContent]
-) -> Optional[SongDetail]:
-    structured = apply_structure(content)
-    content_json = serialize_content(structured)
-    row = db.update_song(song_id, title, content_json)
+def get_song(song_id: int, expand_choruses: bool = False) -> Optional[SongDetail]:
+    row = db.get_song(song_id)
     if row is None:
         return None
-    return SongDetail(
-        id=row.id,
-        title=row.title,
-        content=structured,
-        created_at=row.created_at,
-        updated_at=row.updated_at,
+    return _build_song(row, expand_choruses)
+
+
+def _build_song(row: SongRow, expand_choruses: bool) -> SongDetail:
+    content = deserialize_stored_content(row.content_json)
+    if row.structure_json is None:
+        blocks = detect_structure(content)
+        content = apply_structure(content, blocks)
+    else:
+        # Stored content already carries the sections of its stored block map.
+        blocks = deserialize_structure(row.structure_json, content)
+    if expand_choruses:
+        content = expand_chorus_references(content, blocks)
+    return _song_detail(row, content)
+
+
+@span("songs.encode_song")
+def _encode_song(song: SongDetail, expand_choruses: bool) -> EncodedSong:
+    return EncodedSong(
+        body=song.model_dump_json().encode("utf-8"),
+        etag=song_etag(song.id, song.updated_at, expand_choruses),
+    )
+
+
+def get_encoded_song(
+    song_id: int, expand_choruses: bool = False
+) -> Optional[EncodedSong]:
+    """Return the JSON body of ``get_song`` and its ETag, cached per worker."""
+    sync_song_changes()
+    key = (song_id, expand_choruses)
+    cached = _RESPONSE_CACHE.get(key)
+    if cached is not None:
+        return cached
+    epoch = _RESPONSE_CACHE.epoch
+    song = get_song(song_id, expand_choruses)
+    if song is None:
+        return None
+    encoded = _encode_song(song, expand_choruses)
+    _RESPONSE_CACHE.put(key, encoded, epoch)
+    return encoded
+
+
+def iter_song_batch(song_ids: Sequence[int], expand_choruses: bool) -> Iterator[bytes]:
+    """Yield one NDJSON line per distinct id, in request order.
+
+    Songs missing from the response cache are read with a single query before
+    the first line is yielded; each one is then built and encoded only when
+    its turn comes. Unknown ids yield ``{"id": ..., "error": "Song not found"}``.
+    """
+    sync_song_changes()
+    ordered = list(dict.fromkeys(song_ids))
+    cached = {
+        song_id: _RESPONSE_CACHE.get((song_id, expand_choruses)) for song_id in ordered
+    }
+    epoch = _RESPONSE_CACHE.epoch
+    missing = [song_id for song_id, hit in cached.items() if hit is None]
+    rows = {row.id: row for row in db.get_songs(missing)}
+    for song_id in ordered:
+        encoded = cached[song_id]
+        if encoded is None:
+            row = rows.get(song_id)
+            if row is None:
+                error = {"id": song_id, "error": "Song not found"}
+                yield json_codec.dumps(error) + b"\n"
+                continue
+            encoded = _encode_song(_build_song(row, expand_choruses), expand_choruses)
+            _RESPONSE_CACHE.put((song_id, expand_choruses), encoded, epoch)
+        yield encoded.body + b"\n"
+
+
+@dataclass(frozen=True)
+class StructuredSong:
+    """Song content with its stored columns, computed off the DB executor."""
+
+    content: List[LineContent]
+    content_json: str
+    structure_json: str
+    # None keeps the stored language on update.
+    language: Optional[str]
+
+
+def structure_song(
+    content: List[LineContent], language: Optional[str] = None
+) -> StructuredSong:
+    """Detect verse/chorus blocks in edited content; CPU work."""
+    blocks = detect_structure(content)
+    structured = apply_structure(content, blocks)
+    return StructuredSong(
+        structured,
+        serialize_content(structured),
+        serialize_structure(blocks),
+        language,
+    )
+
+
+def structure_new_song(
+    content: List[LineContent], language: Optional[str] = None
+) -> StructuredSong:
+    """``structure_song`` plus language detection when none was given."""
+    song = structure_song(content, language)
+    if song.language is not None:
+        return song
+    return replace(song, language=detect_language(lyrics_text(song.content)))
+
+
+def structure_prepared_lyrics(
+    content: List[LineContent], language: str
+) -> StructuredSong:
+    """Columns for content built by ``build_content_from_lyrics``."""
+    return StructuredSong(
+        content,
+        serialize_content(content),
+        serialize_structure(detect_structure(content)),
+        language,
+    )
+
+
+def store_new_song(title: str, song: StructuredSong) -> SongDetail:
+    if song.language is None:
+        raise ValueError("A new song needs a language; see structure_new_song")
+    row = db.create_song(title, song.content_json, song.language, song.structure_json)
+    _RESPONSE_CACHE.invalidate((row.id,))
+    return _song_detail(row, song.content)
+
+
+def store_song(song_id: int, title: str, song: StructuredSong) -> Optional[SongDetail]:
+    row = db.update_song(
+        song_id, title, song.content_json, song.structure_json, song.language
+    )
+    _RESPONSE_CACHE.invalidate((song_id,))
+    if row is None:
+        return None
+    return _song_detail(row, song.content)
+
+
+def create_song(
+    title: str, content: List[LineContent], language: Optional[str] = None
+) -> SongDetail:
+    return store_new_song(title, structure_new_song(content, language))
+
+
+def get_song_language(song_id: int) -> Tuple[bool, Optional[str]]:
+    return db.get_song_language(song_id)
+
+
+def update_song_chords(
+    song_id: int,
+    title: str,
+    content: List[LineContent],
+    language: Optional[str] = None,
+) -> Optional[SongDetail]:
+    return store_song(song_id, title, structure_song(content, language))
+
+
+def backfill_song_metadata(stop: Optional[threading.Event] = None) -> int:
+    """Store language and block map for rows written before they were persisted.
+
+    A row that fails is logged and skipped, to be retried on the next run;
+    ``stop`` ends the run after the current batch.
+    """
+    backfilled = 0
+    after_id = 0
+    while stop is None or not stop.is_set():
+        rows = db.fetch_songs_missing_metadata(_BACKFILL_BATCH_SIZE, after_id)
+        if not rows:
+            break
+        for row in rows:
+            try:
+                _backfill_row(row)
+            except Exception:
+                logger.exception("Could not backfill metadata of song %s", row.id)
+                continue
+            backfilled += 1
+        after_id = rows[-1].id
+    return backfilled
+
+
+def _backfill_row(row: SongRow) -> None:
+    content = deserialize_content(row.content_json)
+    blocks = detect_structure(content)
+    structured = apply_structure(content, blocks)
+    db.store_song_metadata(
+        row,
+        serialize_content(structured),
+        row.language or detect_language(lyrics_text(structured)),
+        serialize_structure(blocks),
     )
+    _RESPONSE_CACHE.invalidate((row.id,))
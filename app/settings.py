@@ -1,14 +1,89 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 from typing import Final
 
 BASE_DIR: Final = Path(__file__).resolve().parent
-DATA_DIR: Final = BASE_DIR.parent / "data"
+# GUITAR_DATA_DIR points a server at another database, e.g. for load tests.
+DATA_DIR: Final = Path(os.environ.get("GUITAR_DATA_DIR") or BASE_DIR.parent / "data")
 DB_PATH: Final = DATA_DIR / "songs.db"
 
+# Latency histograms served at /metrics; off by default, when the timing code
+# is not installed at all. Read at import time.
+METRICS_ENABLED: Final = os.environ.get("GUITAR_METRICS") == "1"
+
+# Shared secret for /api/admin endpoints and the X-Profile header; admin
+# features are off while it is unset.
+ADMIN_TOKEN: Final = os.environ.get("GUITAR_ADMIN_TOKEN") or None
+# "off"; "header" profiles a request when an admin sends "X-Profile: 1";
+# "slow" also profiles every API request and keeps those slower than
+# PROFILE_SLOW_SECONDS (one at a time, with cProfile's full overhead).
+PROFILING_MODE: Final = os.environ.get("GUITAR_PROFILING", "header")
+PROFILE_SLOW_SECONDS: Final = 1.0
+PROFILE_DIR: Final = DATA_DIR / "profiles"
+PROFILE_KEEP: Final = 20
+
+# "lazy" loads hyphenation dictionaries and langdetect profiles on first use,
+# for the fastest boot; "prewarm" loads them all during startup, so the first
+# request is as fast as the rest.
+STARTUP_MODE: Final = "lazy"
+
+DB_EXECUTOR_WORKERS: Final = 40
+# Threads for chord propagation and lyrics preparation. They hold the GIL while
+# they work, so more threads than cores only adds contention.
+CPU_EXECUTOR_WORKERS: Final = 4
+# Worker processes for lyrics preparation, which otherwise holds this process's
+# GIL for the whole request; 0 runs it on the CPU executor instead.
+LYRICS_PROCESS_WORKERS: Final = 0
+LYRICS_PROCESS_TIMEOUT_SECONDS: Final = 15.0
+# One connection per database executor thread, so a call never waits for one.
+DB_POOL_SIZE: Final = DB_EXECUTOR_WORKERS
+DB_POOL_TIMEOUT_SECONDS: Final = 10.0
+DB_CACHED_STATEMENTS: Final = 256
+DB_PRAGMAS: Final = {
+    "synchronous": "NORMAL",
+    "cache_size": -16000,
+    "mmap_size": 64 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+SONG_LIST_PAGE_SIZE: Final = 100
+SONG_LIST_MAX_PAGE_SIZE: Final = 500
+# Songs per POST /api/songs/batch, e.g. a rehearsal setlist.
+SONG_BATCH_MAX_SIZE: Final = 100
+# Songs per transaction of a bulk import; a failing song only fails itself.
+IMPORT_BATCH_SIZE: Final = 500
+# Rows an export fetches from its cursor at a time, which bounds its memory.
+EXPORT_FETCH_SIZE: Final = 200
+# Snapshots written by POST /api/admin/backups; older ones are deleted.
+BACKUP_DIR: Final = DATA_DIR / "backups"
+BACKUP_KEEP: Final = 5
+
+# Browsers keep song responses but revalidate them with If-None-Match each time.
+SONG_CACHE_CONTROL: Final = "private, no-cache"
+# Upper bound on the encoded song responses each worker keeps in memory.
+SONG_RESPONSE_CACHE_MAX_BYTES: Final = 32 * 1024 * 1024
+# Rows kept in the song_changes log that workers read to drop stale cache
+# entries; a worker that falls further behind drops its whole cache instead.
+SONG_CHANGE_LOG_RETENTION: Final = 10000
+
+SEARCH_PAGE_SIZE: Final = 20
+SEARCH_MAX_PAGE_SIZE: Final = 100
+# bm25 weight of a title match relative to a lyrics match.
+SEARCH_TITLE_WEIGHT: Final = 10.0
+
 SUPPORTED_LANGUAGES: Final = ("pl", "en", "de", "es", "fr", "pt", "ru")
 DEFAULT_LANGUAGE: Final = "pl"
+# Language detection reads at most this much of the lyrics, minus chords.
+LANGUAGE_SAMPLE_CHARS: Final = 2000
+LANGUAGE_CACHE_SIZE: Final = 1024
+
+CHORD_SESSION_LIMIT: Final = 256
+CHORD_SESSION_TTL_SECONDS: Final = 30 * 60
+
+SYLLABLE_CACHE_SIZE: Final = 4096
+HYPHENATION_CACHE_SIZE: Final = 16384
 
 LANGUAGE_TO_PYPHEN: Final = {
     "pl": "pl_PL",
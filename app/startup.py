@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, MutableMapping
+
+from .logic.chords import warm_hyphenators
+from .logic.language import warm_language_profiles
+
+logger = logging.getLogger(__name__)
+
+Scope = MutableMapping[str, Any]
+ASGIApp = Callable[[Scope, Any, Any], Awaitable[None]]
+
+# Seconds spent on each startup step, reported by GET /api/system/startup so
+# the "lazy" and "prewarm" STARTUP_MODEs can be compared on a given host.
+_TIMINGS: Dict[str, Any] = {}
+
+
+def record(name: str, seconds: float) -> None:
+    _TIMINGS[name] = round(seconds, 6)
+    logger.info("startup %s took %.1f ms", name, seconds * 1000)
+
+
+def timings() -> Dict[str, Any]:
+    return dict(_TIMINGS)
+
+
+def prewarm() -> None:
+    started = time.perf_counter()
+    warm_hyphenators()
+    warm_language_profiles()
+    record("prewarm", time.perf_counter() - started)
+
+
+class FirstRequestTimer:
+    """Records how long the first API request of the process took.
+
+    After that request every call is passed straight through.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._pending = True
+
+    async def __call__(self, scope: Scope, receive: Any, send: Any) -> None:
+        if not (
+            self._pending
+            and scope["type"] == "http"
+            and scope["path"].startswith("/api/")
+        ):
+            await self.app(scope, receive, send)
+            return
+        self._pending = False
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _TIMINGS["first_request_path"] = f"{scope['method']} {scope['path']}"
+            record("first_request", time.perf_counter() - started)
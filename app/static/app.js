@@ -7,7 +7,8 @@ const app = {
         expandChoruses: false,
         showChords: true,
         currentViewContent: null,
-        copyToastTimer: null
+        copyToastTimer: null,
+        listRequest: 0
     },
 
     router: {
@@ -50,7 +51,8 @@ const app = {
             if (view) view.classList.add('active');
 
             if (viewId === 'list') {
-                app.handlers.loadSongsList();
+                const searchInput = document.getElementById('songSearchInput');
+                app.handlers.loadSongsList(searchInput ? searchInput.value : '');
             } else if (viewId === 'song' && params.id) {
                 // If we are navigating to song view, we need to load the song
                 if (app.state.currentSongId !== params.id) {
@@ -110,6 +112,17 @@ const app = {
                 };
             }
 
+            const searchInput = document.getElementById('songSearchInput');
+            if (searchInput) {
+                let searchTimer = null;
+                searchInput.addEventListener('input', () => {
+                    clearTimeout(searchTimer);
+                    searchTimer = setTimeout(() => {
+                        void app.handlers.loadSongsList(searchInput.value);
+                    }, 250);
+                });
+            }
+
             const copyButton = document.getElementById('copySongButton');
             if (copyButton) {
                 copyButton.addEventListener('click', () => {
@@ -139,12 +152,27 @@ const app = {
             app.router.loadView(view, params);
         },
 
-        loadSongsList: async () => {
+        loadSongsList: async (query = '') => {
             console.log("Loading songs list...");
             const container = document.getElementById('songsList');
             container.innerHTML = '<div class="state-message">Loading...</div>';
-
-            const { data, error } = await DB.fetchSongs();
+            // A newer search or reload makes this one's results stale.
+            const listRequest = ++app.state.listRequest;
+
+            const searching = query.trim() !== '';
+            // Both kinds of list page the same way; `next` is the cursor or
+            // offset the following page starts at.
+            const loadPage = searching
+                ? async (offset = 0) => {
+                    const { data, nextOffset, error } = await DB.searchSongs(query.trim(), offset);
+                    return { data, next: nextOffset, error };
+                }
+                : async (cursor = null) => {
+                    const { data, nextCursor, error } = await DB.fetchSongs(cursor);
+                    return { data, next: nextCursor, error };
+                };
+            const { data, next, error } = await loadPage();
+            if (listRequest !== app.state.listRequest) return;
             if (error) {
                 console.error("Error fetching songs:", error);
                 container.innerHTML = `<div class="state-message error">Error loading songs: ${error.message}</div>`;
@@ -153,11 +181,18 @@ const app = {
 
             container.innerHTML = '';
             if (!data || data.length === 0) {
-                container.innerHTML = '<div class="state-message">No songs yet. Create your first one.</div>';
+                container.innerHTML = searching
+                    ? '<div class="state-message">No songs match your search.</div>'
+                    : '<div class="state-message">No songs yet. Create your first one.</div>';
                 return;
             }
 
-            data.forEach(song => {
+            app.handlers.appendSongItems(container, data);
+            if (next != null) app.handlers.appendLoadMore(container, loadPage, next, listRequest);
+        },
+
+        appendSongItems: (container, songs) => {
+            songs.forEach(song => {
                 const el = document.createElement('div');
                 el.className = 'song-item';
                 el.tabIndex = 0;
@@ -179,6 +214,34 @@ const app = {
             });
         },
 
+        // The list shows one page at a time; this row fetches the next one.
+        appendLoadMore: (container, loadPage, next, listRequest) => {
+            const row = document.createElement('div');
+            row.className = 'song-list-more';
+            const button = document.createElement('button');
+            button.className = 'btn ghost';
+            button.textContent = 'Load more';
+            button.onclick = async () => {
+                button.disabled = true;
+                button.textContent = 'Loading...';
+                const { data, next: following, error } = await loadPage(next);
+                if (listRequest !== app.state.listRequest) return;
+                if (error) {
+                    console.error("Error fetching songs:", error);
+                    button.disabled = false;
+                    button.textContent = 'Retry loading more';
+                    return;
+                }
+                row.remove();
+                app.handlers.appendSongItems(container, data);
+                if (following != null) {
+                    app.handlers.appendLoadMore(container, loadPage, following, listRequest);
+                }
+            };
+            row.appendChild(button);
+            container.appendChild(row);
+        },
+
         startNewSong: (navigate = true) => {
             console.log("Starting new song");
             app.state.currentSongId = null;
@@ -230,7 +293,7 @@ const app = {
                 data.title,
                 lyricsText,
                 data.content,
-                app.state.languageLocked ? app.state.currentLanguage : null
+                app.state.languageLocked ? app.state.currentLanguage : data.language
             );
 
             if (prepared.error) {
@@ -303,7 +366,12 @@ const app = {
             const title = document.getElementById('songTitleInput').value;
             const content = app.ui.scrapeContentFromEditor();
 
-            const result = await DB.saveSong(app.state.currentSongId, title, content);
+            const result = await DB.saveSong(
+                app.state.currentSongId,
+                title,
+                content,
+                app.state.currentLanguage
+            );
             if (result.error) {
                 console.error("Error saving:", result.error);
                 alert("Error saving: " + result.error.message);
@@ -370,53 +438,41 @@ const app = {
                 return;
             }
 
-            app.state.editingContent = data.content;
+            app.handlers.applyChordPatches(content, data.patches);
+            app.state.editingContent = content;
             const container = document.getElementById('chordEditorContainer');
-            app.ui.renderSong(data.content, container, true);
+            app.ui.renderSong(content, container, true);
         },
 
-        applyChordMove: async (originLine, originChar, targetLine, targetChar, chordText) => {
-            let content = app.ui.scrapeContentFromEditor();
-            if (!content[originLine]) return;
-
-            if (content[originLine].chords && content[originLine].chords[originChar]) {
-                delete content[originLine].chords[originChar];
-            }
-
-            const removal = await DB.previewChords(
-                content,
-                originLine,
-                originChar,
-                null,
-                app.state.currentLanguage || 'pl'
-            );
-
-            if (removal.error) {
-                alert("Failed to move chord: " + removal.error.message);
-                return;
-            }
+        applyChordPatches: (content, patches) => {
+            patches.forEach(patch => {
+                if (content[patch.line_index]) {
+                    content[patch.line_index].chords = patch.chords;
+                }
+            });
+        },
 
-            content = removal.data.content;
-            if (!content[targetLine]) return;
-            if (!content[targetLine].chords) content[targetLine].chords = {};
-            content[targetLine].chords[targetChar] = { text: chordText, type: 'manual' };
+        applyChordMove: async (originLine, originChar, targetLine, targetChar, chordText) => {
+            const content = app.ui.scrapeContentFromEditor();
+            if (!content[originLine] || !content[targetLine]) return;
 
-            const addition = await DB.previewChords(
+            const { data, error } = await DB.previewChordEdits(
                 content,
-                targetLine,
-                targetChar,
-                chordText,
+                [
+                    { line_index: originLine, char_index: originChar, chord: null },
+                    { line_index: targetLine, char_index: targetChar, chord: chordText }
+                ],
                 app.state.currentLanguage || 'pl'
             );
 
-            if (addition.error) {
-                alert("Failed to move chord: " + addition.error.message);
+            if (error) {
+                alert("Failed to move chord: " + error.message);
                 return;
             }
 
-            app.state.editingContent = addition.data.content;
+            app.state.editingContent = data.content;
             const container = document.getElementById('chordEditorContainer');
-            app.ui.renderSong(addition.data.content, container, true);
+            app.ui.renderSong(data.content, container, true);
         },
 
         handleDragStart: (e) => {
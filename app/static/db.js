@@ -1,54 +1,90 @@
 const DB = (function () {
     const apiBase = '/api';
 
+    // Song responses carry ETags; keep the last copy of each so reopening a
+    // song only costs a 304 when it has not changed.
+    const songCache = new Map();
+
+    const responseError = async (response) => {
+        let message = response.statusText;
+        try {
+            const data = await response.json();
+            if (data && data.detail) message = data.detail;
+        } catch (err) {
+            // Ignore parse errors
+        }
+        return new Error(message);
+    };
+
     const request = async (path, options = {}) => {
         const response = await fetch(`${apiBase}${path}`, {
             headers: { 'Content-Type': 'application/json' },
             ...options
         });
 
-        if (!response.ok) {
-            let message = response.statusText;
-            try {
-                const data = await response.json();
-                if (data && data.detail) message = data.detail;
-            } catch (err) {
-                // Ignore parse errors
-            }
-            throw new Error(message);
-        }
+        if (!response.ok) throw await responseError(response);
 
         if (response.status === 204) return null;
         return response.json();
     };
 
+    const cachedRequest = async (path) => {
+        const cached = songCache.get(path);
+        const headers = { 'Content-Type': 'application/json' };
+        if (cached) headers['If-None-Match'] = cached.etag;
+
+        const response = await fetch(`${apiBase}${path}`, { headers });
+        if (response.status === 304 && cached) return structuredClone(cached.data);
+        if (!response.ok) throw await responseError(response);
+
+        const data = await response.json();
+        const etag = response.headers.get('ETag');
+        if (etag) songCache.set(path, { etag, data: structuredClone(data) });
+        return data;
+    };
+
     return {
         init: () => { },
         isConnected: () => true,
         requireConnection: () => true,
 
-        async fetchSongs() {
+        // One page of the song list; pass the previous page's nextCursor to
+        // continue after it.
+        async fetchSongs(cursor = null) {
             try {
-                const data = await request('/songs');
-                return { data, error: null };
+                const query = cursor ? `?after=${encodeURIComponent(cursor)}` : '';
+                const page = await request(`/songs${query}`);
+                return { data: page.items, nextCursor: page.next_cursor, error: null };
             } catch (error) {
-                return { data: null, error };
+                return { data: null, nextCursor: null, error };
+            }
+        },
+
+        // One page of search results; pass the previous page's nextOffset to
+        // continue after it.
+        async searchSongs(query, offset = 0) {
+            try {
+                const q = encodeURIComponent(query);
+                const page = await request(`/songs/search?q=${q}&limit=100&offset=${offset}`);
+                return { data: page.items, nextOffset: page.next_offset, error: null };
+            } catch (error) {
+                return { data: null, nextOffset: null, error };
             }
         },
 
         async getSong(id, expandChoruses = false) {
             try {
                 const flag = expandChoruses ? 'true' : 'false';
-                const data = await request(`/songs/${id}?expand_choruses=${flag}`);
+                const data = await cachedRequest(`/songs/${id}?expand_choruses=${flag}`);
                 return { data, error: null };
             } catch (error) {
                 return { data: null, error };
             }
         },
 
-        async saveSong(songId, title, content) {
+        async saveSong(songId, title, content, language) {
             try {
-                const payload = JSON.stringify({ title, content });
+                const payload = JSON.stringify({ title, content, language });
                 const data = songId
                     ? await request(`/songs/${songId}/chords`, { method: 'PUT', body: payload })
                     : await request('/songs', { method: 'POST', body: payload });
@@ -82,7 +118,17 @@ const DB = (function () {
                     chord,
                     language
                 });
-                const data = await request('/chords/preview', { method: 'POST', body: payload });
+                const data = await request('/chords/preview/delta', { method: 'POST', body: payload });
+                return { data, error: null };
+            } catch (error) {
+                return { data: null, error };
+            }
+        },
+
+        async previewChordEdits(content, edits, language) {
+            try {
+                const payload = JSON.stringify({ content, edits, language });
+                const data = await request('/chords/preview/batch', { method: 'POST', body: payload });
                 return { data, error: null };
             } catch (error) {
                 return { data: null, error };
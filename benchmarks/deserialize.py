@@ -0,0 +1,52 @@
+"""Compare the validated and trusted decode paths for stored song content."""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, List
+
+from app.logic.chords import apply_structure
+from app.schemas import LineContent
+from app.services.content import (
+    deserialize_content,
+    deserialize_stored_content,
+    serialize_content,
+)
+
+from .songs import make_song
+
+
+def best_of(
+    func: Callable[[str], List[LineContent]], payload: str, repeat: int
+) -> float:
+    func(payload)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(payload)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"{'lines':>6}{'chords':>8}{'KiB':>8}{'validated ms':>14}{'trusted ms':>12}")
+    for verses, chords_per_line in ((4, 2), (30, 4), (60, 8)):
+        lines = apply_structure(
+            make_song(verses=verses, chords_per_line=chords_per_line)
+        )
+        payload = serialize_content(lines)
+        validated = best_of(deserialize_content, payload, args.repeat)
+        trusted = best_of(deserialize_stored_content, payload, args.repeat)
+        print(
+            f"{len(lines):>6}{chords_per_line:>8}{len(payload.encode()) / 1024:>8.1f}"
+            f"{validated * 1000:>14.2f}{trusted * 1000:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""Load test a real uvicorn server of the app on a seeded temporary database.
+
+The server runs in a subprocess with ``GUITAR_DATA_DIR`` pointing at a fresh
+directory, so nothing touches ``data/songs.db``. Client threads replay a mix
+of list, read, prepare, preview and chord save requests over keep-alive
+connections. The tool then reports p50/p95/p99 latency and throughput for
+each endpoint::
+
+    python -m benchmarks.load --songs 500 --concurrency 16 --duration 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.content import render_inline_lyrics
+
+from .songs import make_shaped_song
+
+# (endpoint name, weight); the weights approximate one editing session per
+# handful of people browsing.
+MIX: Tuple[Tuple[str, int], ...] = (
+    ("GET /api/songs", 10),
+    ("GET /api/songs/{id}", 35),
+    ("GET /api/songs/{id}?expand_choruses=true", 15),
+    ("POST /api/lyrics/prepare", 10),
+    ("POST /api/chords/preview/delta", 20),
+    ("PUT /api/songs/{id}/chords", 10),
+)
+
+
+@dataclass
+class Stats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed(data_dir: Path, count: int, seed: int) -> Dict[int, List[dict]]:
+    """Create ``count`` songs of mixed shapes and return their content by id."""
+    from app import db
+    from app.services import songs as song_service
+
+    db.DATA_DIR = data_dir
+    db.DB_PATH = data_dir / "songs.db"
+    db.init_db()
+    rng = random.Random(seed)
+    contents: Dict[int, List[dict]] = {}
+    try:
+        for index in range(count):
+            shape = rng.choices(("short", "typical", "long"), (3, 6, 1))[0]
+            language = rng.choice(("pl", "pl", "en", "de"))
+            lines = make_shaped_song(shape, "typical", language, seed=index)
+            song = song_service.create_song(f"Song {index}", lines, language)
+            contents[song.id] = [line.model_dump(mode="json") for line in song.content]
+    finally:
+        db.close_pool()
+    return contents
+
+
+def start_server(data_dir: Path, port: int, workers: int) -> subprocess.Popen:
+    env = {**os.environ, "GUITAR_DATA_DIR": str(data_dir)}
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+        "--no-access-log",
+    ]
+    if workers > 1:
+        command += ["--workers", str(workers)]
+    server = subprocess.Popen(command, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+        try:
+            conn.request("GET", "/api/songs?limit=1")
+            if conn.getresponse().status == 200:
+                return server
+        except (OSError, http.client.HTTPException):
+            # Not listening yet, or a worker dropped the connection while booting.
+            pass
+        finally:
+            conn.close()
+        time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start within 30 seconds")
+
+
+class Client:
+    """One keep-alive connection that issues requests from ``MIX``."""
+
+    def __init__(
+        self, port: int, contents: Dict[int, List[dict]], rng: random.Random
+    ) -> None:
+        self.port = port
+        self.contents = contents
+        self.song_ids = list(contents)
+        self.rng = rng
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+
+    def send(self, method: str, path: str, payload: Optional[bytes] = None) -> int:
+        headers = {"Content-Type": "application/json"} if payload else {}
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=30)
+            return 0
+
+    def build(self, endpoint: str) -> Tuple[str, str, Optional[bytes]]:
+        """Pick a song and build the request, outside the timed part."""
+        method, path, body = self._request(endpoint)
+        payload = None if body is None else json.dumps(body).encode("utf-8")
+        return method, path, payload
+
+    def _request(self, endpoint: str) -> Tuple[str, str, Optional[Any]]:
+        song_id = self.rng.choice(self.song_ids)
+        content = self.contents[song_id]
+        if endpoint == "GET /api/songs":
+            return "GET", "/api/songs", None
+        if endpoint == "GET /api/songs/{id}":
+            return "GET", f"/api/songs/{song_id}", None
+        if endpoint == "GET /api/songs/{id}?expand_choruses=true":
+            return "GET", f"/api/songs/{song_id}?expand_choruses=true", None
+        if endpoint == "POST /api/lyrics/prepare":
+            lyrics = render_inline_lyrics(make_shaped_song("typical", seed=song_id))
+            return "POST", "/api/lyrics/prepare", {"title": "Draft", "lyrics": lyrics}
+        line_index = self.rng.randrange(len(content))
+        char_index = self.rng.randrange(max(1, len(content[line_index]["text"])))
+        if endpoint == "POST /api/chords/preview/delta":
+            return (
+                "POST",
+                "/api/chords/preview/delta",
+                {
+                    "content": content,
+                    "line_index": line_index,
+                    "char_index": char_index,
+                    "chord": self.rng.choice(("G", "Am", "C")),
+                },
+            )
+        return (
+            "PUT",
+            f"/api/songs/{song_id}/chords",
+            {"title": f"Song {song_id}", "content": content},
+        )
+
+
+def run_load(
+    port: int,
+    contents: Dict[int, List[dict]],
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> Tuple[Dict[str, Stats], float]:
+    stats = {name: Stats() for name, _ in MIX}
+    lock = threading.Lock()
+    names = [name for name, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    deadline = time.perf_counter() + duration
+
+    def worker(index: int) -> None:
+        rng = random.Random(seed + index)
+        client = Client(port, contents, rng)
+        local: Dict[str, Stats] = {name: Stats() for name in names}
+        while time.perf_counter() < deadline:
+            endpoint = rng.choices(names, weights)[0]
+            request = client.build(endpoint)
+            started = time.perf_counter()
+            status = client.send(*request)
+            elapsed = time.perf_counter() - started
+            if 200 <= status < 300:
+                local[endpoint].latencies.append(elapsed)
+            else:
+                local[endpoint].errors += 1
+        client.conn.close()
+        with lock:
+            for name, result in local.items():
+                stats[name].latencies.extend(result.latencies)
+                stats[name].errors += result.errors
+
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=worker, args=(index,)) for index in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats, time.perf_counter() - started
+
+
+def _percentile(quantiles: List[float], percent: int) -> float:
+    return quantiles[percent - 1] * 1000
+
+
+def summarize(stats: Dict[str, Stats], elapsed: float) -> Dict[str, Dict[str, Any]]:
+    summary: Dict[str, Dict[str, Any]] = {}
+    everything = Stats()
+    for name, result in [*stats.items(), ("total", everything)]:
+        if name != "total":
+            everything.latencies.extend(result.latencies)
+            everything.errors += result.errors
+        row: Dict[str, Any] = {
+            "requests": len(result.latencies),
+            "errors": result.errors,
+            "throughput_rps": len(result.latencies) / elapsed,
+        }
+        if len(result.latencies) >= 2:
+            quantiles = statistics.quantiles(result.latencies, n=100)
+            row.update(
+                p50_ms=_percentile(quantiles, 50),
+                p95_ms=_percentile(quantiles, 95),
+                p99_ms=_percentile(quantiles, 99),
+            )
+        summary[name] = row
+    return summary
+
+
+def _print_summary(summary: Dict[str, Dict[str, Any]]) -> None:
+    print(
+        f"{'endpoint':<44}{'requests':>9}{'errors':>8}{'req/s':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    )
+    missing = float("nan")
+    for name, row in summary.items():
+        print(
+            f"{name:<44}{row['requests']:>9}{row['errors']:>8}"
+            f"{row['throughput_rps']:>9.1f}{row.get('p50_ms', missing):>9.2f}"
+            f"{row.get('p95_ms', missing):>9.2f}{row.get('p99_ms', missing):>9.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--songs", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the summary to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        print(f"Seeding {args.songs} songs...")
+        contents = seed(data_dir, args.songs, args.seed)
+        port = _free_port()
+        server = start_server(data_dir, port, args.workers)
+        try:
+            print(
+                f"Running {args.concurrency} clients for {args.duration:g}s "
+                f"against {args.workers} worker(s)..."
+            )
+            stats, elapsed = run_load(
+                port, contents, args.concurrency, args.duration, args.seed
+            )
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    summary = summarize(stats, elapsed)
+    _print_summary(summary)
+    if args.output:
+        report: Dict[str, Any] = {"settings": vars(args), "endpoints": summary}
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import random
+from typing import List
+
+from app.schemas import ChordEntry, LineContent
+
+_WORDS = {
+    "pl": "gdy wieczorem cicho płynie rzeka przez zielone łąki śpiewa wiatr "
+    "nad miastem światło gaśnie zanim przyjdzie nowy dzień".split(),
+    "en": "when the evening river slowly carries all the silver light across "
+    "the open fields we sing until the morning comes again".split(),
+    "de": "wenn der abend leise über stille felder zieht singen wir das "
+    "alte lied bis zum morgen wieder licht".split(),
+    "es": "cuando la noche cae sobre el río lento cantamos juntos una "
+    "canción antigua hasta la mañana clara".split(),
+}
+LANGUAGES = tuple(_WORDS)
+
+# (verses, lines_per_block); each verse adds a chorus, so "long" is 500 lines.
+SHAPES = {"short": (1, 4), "typical": (4, 4), "long": (50, 4)}
+CHORD_DENSITIES = {"sparse": 1, "typical": 2, "dense": 6}
+_CHORDS = ("G", "D", "Em", "C", "Am", "F", "E7", "Hm")
+
+
+def make_line(rng: random.Random, language: str, chords_per_line: int) -> LineContent:
+    words = _WORDS[language]
+    text = " ".join(rng.choice(words) for _ in range(rng.randint(4, 8)))
+    chords = {
+        index: ChordEntry(text=rng.choice(_CHORDS), type="manual")
+        for index in sorted(
+            rng.sample(range(len(text)), min(chords_per_line, len(text)))
+        )
+    }
+    return LineContent(text=text, chords=chords)
+
+
+def make_song(
+    verses: int = 4,
+    lines_per_block: int = 4,
+    chords_per_line: int = 2,
+    language: str = "pl",
+    seed: int = 0,
+) -> List[LineContent]:
+    """Build a song of numbered verses each followed by the same chorus."""
+    rng = random.Random(seed)
+    chorus = [make_line(rng, language, chords_per_line) for _ in range(lines_per_block)]
+    lines: List[LineContent] = []
+    for verse in range(verses):
+        block = [
+            make_line(rng, language, chords_per_line) for _ in range(lines_per_block)
+        ]
+        block[0] = block[0].model_copy(update={"text": f"{verse + 1}. {block[0].text}"})
+        lines.extend(block)
+        lines.append(LineContent(text=""))
+        lines.extend(line.model_copy(deep=True) for line in chorus)
+        lines.append(LineContent(text=""))
+    return lines
+
+
+def make_shaped_song(
+    shape: str, density: str = "typical", language: str = "pl", seed: int = 0
+) -> List[LineContent]:
+    verses, lines_per_block = SHAPES[shape]
+    return make_song(
+        verses=verses,
+        lines_per_block=lines_per_block,
+        chords_per_line=CHORD_DENSITIES[density],
+        language=language,
+        seed=seed,
+    )
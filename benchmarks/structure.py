@@ -0,0 +1,100 @@
+"""Time and memory of the copy-on-write structure pipeline.
+
+The ``legacy`` variants reproduce the copying the pipeline used to do (a deep
+copy of every line per stage) on top of the same structure logic, so the
+difference between the two columns is the cost of those copies.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable, List
+
+from app.logic.chords import (
+    apply_structure,
+    detect_structure,
+    expand_chorus_references,
+    propagate_chords,
+)
+from app.schemas import LineContent
+
+from .songs import make_song
+
+Lines = List[LineContent]
+
+
+def _deep(lines: Lines) -> Lines:
+    return [line.model_copy(deep=True) for line in lines]
+
+
+def legacy_apply_structure(lines: Lines) -> Lines:
+    return apply_structure(_deep(lines))
+
+
+def legacy_expand_chorus_references(lines: Lines) -> Lines:
+    structured = legacy_apply_structure(lines)
+    detect_structure(structured)
+    return _deep(expand_chorus_references(structured))
+
+
+def legacy_propagate_chords(lines: Lines) -> Lines:
+    return propagate_chords(_deep(lines), 0, 0, "G", "pl")
+
+
+def current_propagate_chords(lines: Lines) -> Lines:
+    return propagate_chords(lines, 0, 0, "G", "pl")
+
+
+def measure(
+    func: Callable[[Lines], Lines], lines: Lines, repeat: int
+) -> tuple[float, int]:
+    func(lines)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(lines)
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    func(lines)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--verses", type=int, default=60)
+    parser.add_argument("--chords-per-line", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    lines = apply_structure(
+        make_song(verses=args.verses, chords_per_line=args.chords_per_line)
+    )
+    cases = [
+        ("apply_structure", legacy_apply_structure, apply_structure),
+        (
+            "expand_chorus_references",
+            legacy_expand_chorus_references,
+            expand_chorus_references,
+        ),
+        ("propagate_chords", legacy_propagate_chords, current_propagate_chords),
+    ]
+    print(f"{len(lines)} lines, {args.chords_per_line} chords per line")
+    print(
+        f"{'stage':<26}{'legacy ms':>11}{'current ms':>12}"
+        f"{'legacy KiB':>12}{'current KiB':>13}"
+    )
+    for name, legacy, current in cases:
+        legacy_time, legacy_peak = measure(legacy, lines, args.repeat)
+        current_time, current_peak = measure(current, lines, args.repeat)
+        print(
+            f"{name:<26}{legacy_time * 1000:>11.2f}{current_time * 1000:>12.2f}"
+            f"{legacy_peak / 1024:>12.1f}{current_peak / 1024:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Benchmark suite for the chord/structure engine and the API hot paths.
+
+``run`` times every case and writes the results as JSON; ``compare`` reads two
+such files and exits with status 1 if any case got slower than the threshold::
+
+    python -m benchmarks.suite run --output base.json
+    python -m benchmarks.suite run --output new.json
+    python -m benchmarks.suite compare base.json new.json --threshold 0.15
+
+Songs come from ``benchmarks.songs`` with fixed seeds, so two runs time the
+same inputs. Endpoint cases go through the ASGI test client against a
+temporary database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.logic.chords import (
+    apply_structure,
+    clear_syllable_caches,
+    detect_structure,
+    get_syllables,
+    propagate_chords,
+)
+from app.logic.language import clear_language_cache
+from app.services.content import (
+    build_content_from_lyrics,
+    deserialize_content,
+    deserialize_stored_content,
+    render_inline_lyrics,
+    serialize_content,
+)
+
+from .songs import LANGUAGES, make_shaped_song
+
+
+@dataclass
+class Case:
+    name: str
+    func: Callable[[], Any]
+    # Runs untimed before every timed call, e.g. to empty caches.
+    setup: Optional[Callable[[], None]] = None
+
+
+def _clear_caches() -> None:
+    clear_syllable_caches()
+    clear_language_cache()
+
+
+def engine_cases() -> Iterator[Case]:
+    for shape in ("short", "typical", "long"):
+        for density in ("sparse", "dense"):
+            for language in LANGUAGES:
+                lines = apply_structure(make_shaped_song(shape, density, language))
+                texts = [line.text for line in lines]
+                lyrics = render_inline_lyrics(lines)
+                payload = serialize_content(lines)
+                suffix = f"{shape}/{density}/{language}"
+
+                def syllables(texts=texts, language=language) -> None:
+                    for text in texts:
+                        get_syllables(text, language)
+
+                yield Case(f"get_syllables/{suffix}", syllables, _clear_caches)
+                yield Case(
+                    f"build_content_from_lyrics/{suffix}",
+                    lambda lyrics=lyrics, language=language: build_content_from_lyrics(
+                        lyrics, None, language
+                    ),
+                    _clear_caches,
+                )
+                if language != "pl":
+                    continue
+                # The rest do not depend on the language.
+                yield Case(
+                    f"detect_structure/{shape}/{density}",
+                    lambda lines=lines: detect_structure(lines),
+                )
+                yield Case(
+                    f"propagate_chords/{shape}/{density}",
+                    lambda lines=lines: propagate_chords(lines, 0, 0, "G", "pl"),
+                    _clear_caches,
+                )
+                yield Case(
+                    f"serialize_content/{shape}/{density}",
+                    lambda lines=lines: serialize_content(lines),
+                )
+                yield Case(
+                    f"deserialize_content/{shape}/{density}",
+                    lambda payload=payload: deserialize_content(payload),
+                )
+                yield Case(
+                    f"deserialize_stored_content/{shape}/{density}",
+                    lambda payload=payload: deserialize_stored_content(payload),
+                )
+
+
+def endpoint_cases(client: Any) -> Iterator[Case]:
+    """Cases for ``client``, a TestClient of the app on an empty database."""
+    from app.services.songs import clear_response_cache
+
+    def get(url: str) -> Callable[[], None]:
+        def call() -> None:
+            client.get(url).raise_for_status()
+
+        return call
+
+    for shape in ("typical", "long"):
+        lines = apply_structure(make_shaped_song(shape, "typical", "pl"))
+        content = [line.model_dump(mode="json") for line in lines]
+        song = client.post(
+            "/api/songs", json={"title": shape, "content": content, "language": "pl"}
+        ).json()
+        path = f"/api/songs/{song['id']}"
+        yield Case(f"GET song/{shape}/cold", get(path), clear_response_cache)
+        yield Case(f"GET song/{shape}/cached", get(path))
+        yield Case(
+            f"GET song/{shape}/expanded",
+            get(f"{path}?expand_choruses=true"),
+            clear_response_cache,
+        )
+        yield Case(
+            f"POST lyrics/prepare/{shape}",
+            lambda lyrics=render_inline_lyrics(lines), shape=shape: client.post(
+                "/api/lyrics/prepare",
+                json={"title": shape, "lyrics": lyrics, "language": "pl"},
+            ).raise_for_status(),
+            _clear_caches,
+        )
+        yield Case(
+            f"POST chords/preview/delta/{shape}",
+            lambda content=content: client.post(
+                "/api/chords/preview/delta",
+                json={
+                    "content": content,
+                    "line_index": 0,
+                    "char_index": 0,
+                    "chord": "G",
+                    "language": "pl",
+                },
+            ).raise_for_status(),
+        )
+        yield Case(
+            f"PUT song chords/{shape}",
+            lambda path=path, content=content, shape=shape: client.put(
+                f"{path}/chords",
+                json={"title": shape, "content": content, "language": "pl"},
+            ).raise_for_status(),
+        )
+    yield Case("GET songs", get("/api/songs"))
+
+
+def measure(case: Case, repeat: int) -> Dict[str, float]:
+    if case.setup:
+        case.setup()
+    case.func()
+    samples: List[float] = []
+    for _ in range(repeat):
+        if case.setup:
+            case.setup()
+        started = time.perf_counter()
+        case.func()
+        samples.append(time.perf_counter() - started)
+    return {
+        "median_ms": statistics.median(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+        "runs": repeat,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _run_endpoint_cases(
+    repeat: int, selected: Callable[[str], bool]
+) -> Dict[str, Dict[str, float]]:
+    from fastapi.testclient import TestClient
+
+    from app import db
+    from app.main import app
+
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        db.DATA_DIR = Path(data_dir)
+        db.DB_PATH = Path(data_dir) / "songs.db"
+        with TestClient(app) as client:
+            for case in endpoint_cases(client):
+                if selected(case.name):
+                    results[case.name] = measure(case, repeat)
+                    _print_result(case.name, results[case.name])
+    return results
+
+
+def _print_result(name: str, result: Dict[str, float]) -> None:
+    print(f"{name:<52}{result['median_ms']:>10.3f} ms{result['min_ms']:>10.3f} ms")
+
+
+def run(args: argparse.Namespace) -> None:
+    def selected(name: str) -> bool:
+        return args.filter is None or args.filter in name
+
+    print(f"{'case':<52}{'median':>13}{'min':>13}")
+    results: Dict[str, Dict[str, float]] = {}
+    if not args.skip_engine:
+        for case in engine_cases():
+            if selected(case.name):
+                results[case.name] = measure(case, args.repeat)
+                _print_result(case.name, results[case.name])
+    if not args.skip_endpoints:
+        results.update(_run_endpoint_cases(args.repeat, selected))
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Wrote {len(results)} results to {args.output}")
+
+
+def compare(args: argparse.Namespace) -> int:
+    base = json.loads(Path(args.base).read_text())["results"]
+    new = json.loads(Path(args.new).read_text())["results"]
+    regressions = 0
+    print(f"{'case':<52}{'base ms':>10}{'new ms':>10}{'change':>9}")
+    for name in sorted(base.keys() & new.keys()):
+        before = base[name]["median_ms"]
+        after = new[name]["median_ms"]
+        change = after / before - 1 if before else 0.0
+        flag = ""
+        if change > args.threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{name:<52}{before:>10.3f}{after:>10.3f}{change:>+9.1%}{flag}")
+    for name in sorted(base.keys() ^ new.keys()):
+        print(f"{name:<52}  only in {'base' if name in base else 'new'}")
+    print(f"{regressions} case(s) slower than {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="time every case")
+    run_parser.add_argument("--repeat", type=int, default=20)
+    run_parser.add_argument("--output", help="write results to this JSON file")
+    run_parser.add_argument("--filter", help="only cases whose name contains this")
+    run_parser.add_argument("--skip-engine", action="store_true")
+    run_parser.add_argument("--skip-endpoints", action="store_true")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="relative slowdown of the median that counts as a regression",
+    )
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
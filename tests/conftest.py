@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import db
+from app.main import app
+from app.services.songs import clear_response_cache
+
+
+@pytest.fixture
+def temp_db(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    db_path = tmp_path / "songs.db"
+    monkeypatch.setattr(db, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(db, "DB_PATH", db_path)
+    db.init_db()
+    clear_response_cache()
+    yield db_path
+    db.close_pool()
+
+
+@pytest.fixture
+def client(temp_db: Path) -> Iterator[TestClient]:
+    with TestClient(app) as test_client:
+        yield test_client
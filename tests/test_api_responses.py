@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app import json_codec
+from app.api.responses import FastJSONResponse
+from app.schemas import LineContent, SongDetail
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_fast_json_response_matches_default_encoding(
+    use_orjson: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if not use_orjson:
+        monkeypatch.setattr(json_codec, "orjson", None)
+    song = SongDetail(
+        id=1,
+        title='Żółw "w" ogrodzie',
+        content=[
+            LineContent(text="Gdy wieczorem", chords={0: "G"}, section="verse"),
+            LineContent(text="", chords={}),
+        ],
+        created_at="2024-01-01T00:00:00+00:00",
+        updated_at="2024-01-02T00:00:00+00:00",
+    )
+    expected = JSONResponse(jsonable_encoder(song)).body
+
+    assert FastJSONResponse(song).body == expected
+    assert FastJSONResponse(jsonable_encoder(song)).body == expected
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import executors
+from app.api import songs as songs_api
+
+
+def _create_song(client: TestClient) -> dict:
+    response = client.post(
+        "/api/songs",
+        json={"title": "Song", "content": [{"text": "Line", "chords": {}}]},
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_song_read_revalidates_with_etag(client: TestClient) -> None:
+    song = _create_song(client)
+
+    first = client.get(f"/api/songs/{song['id']}")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    cached = client.get(f"/api/songs/{song['id']}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    expanded = client.get(
+        f"/api/songs/{song['id']}?expand_choruses=true",
+        headers={"If-None-Match": etag},
+    )
+    assert expanded.status_code == 200
+    assert expanded.headers["ETag"] != etag
+
+    client.put(
+        f"/api/songs/{song['id']}/chords",
+        json={"title": "Renamed", "content": song["content"]},
+    )
+    changed = client.get(f"/api/songs/{song['id']}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["title"] == "Renamed"
+
+
+def test_song_list_revalidates_with_etag(client: TestClient) -> None:
+    _create_song(client)
+    etag = client.get("/api/songs").headers["ETag"]
+
+    assert client.get("/api/songs", headers={"If-None-Match": etag}).status_code == 304
+
+    _create_song(client)
+    assert client.get("/api/songs", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_song_reads_are_served_from_response_cache(client: TestClient) -> None:
+    song = _create_song(client)
+
+    first = client.get(f"/api/songs/{song['id']}")
+    second = client.get(f"/api/songs/{song['id']}")
+    assert first.content == second.content
+    stats = client.get("/api/system/caches").json()["song_responses"]
+    assert stats["hits"] >= 1
+    assert stats["entries"] >= 1
+
+    client.put(
+        f"/api/songs/{song['id']}/chords",
+        json={"title": "Renamed", "content": song["content"]},
+    )
+    assert client.get(f"/api/songs/{song['id']}").json()["title"] == "Renamed"
+
+
+def test_song_batch_streams_ndjson_in_request_order(client: TestClient) -> None:
+    first = _create_song(client)
+    second = _create_song(client)
+    expanded = client.get(f"/api/songs/{first['id']}?expand_choruses=true")
+
+    response = client.post(
+        "/api/songs/batch",
+        json={
+            "ids": [second["id"], 999, first["id"], second["id"]],
+            "expand_choruses": True,
+        },
+    )
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.content.splitlines()
+    assert [json.loads(line).get("id") for line in lines] == [
+        second["id"],
+        999,
+        first["id"],
+    ]
+    assert json.loads(lines[1]) == {"id": 999, "error": "Song not found"}
+    assert lines[2] == expanded.content
+
+
+def test_song_import_reads_ndjson_and_reports_errors(client: TestClient) -> None:
+    body = "\n".join(
+        [
+            json.dumps({"title": "One", "lyrics": "{C}First line", "language": "en"}),
+            "{broken",
+            json.dumps({"title": "Two", "lyrics": "Second line"}),
+        ]
+    )
+
+    response = client.post(
+        "/api/songs/import",
+        content=body.encode("utf-8"),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    report = response.json()
+    assert response.status_code == 200
+    assert report["imported"] == 2
+    assert [error["source"] for error in report["errors"]] == ["line:2"]
+    song = client.get(f"/api/songs/{report['ids'][0]}").json()
+    assert song["title"] == "One"
+    assert song["content"][0]["chords"]["0"]["text"] == "C"
+
+
+def test_song_export_streams_library(client: TestClient) -> None:
+    _create_song(client)
+    _create_song(client)
+
+    ndjson = client.get("/api/songs/export")
+    text = client.get("/api/songs/export?format=text")
+
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    assert "songs.ndjson" in ndjson.headers["content-disposition"]
+    assert [json.loads(line)["lyrics"] for line in ndjson.content.splitlines()] == [
+        "Line",
+        "Line",
+    ]
+    assert text.text == "# Song\n\nLine\n\n# Song\n\nLine\n\n"
+    assert client.get("/api/songs/export?format=csv").status_code == 422
+
+
+def test_stored_language_must_be_supported(client: TestClient) -> None:
+    content = [{"text": "Line", "chords": {}}]
+
+    rejected = client.post(
+        "/api/songs", json={"title": "Song", "content": content, "language": "zz"}
+    )
+    song = client.post(
+        "/api/songs", json={"title": "Song", "content": content, "language": "en"}
+    ).json()
+    chords = client.put(
+        f"/api/songs/{song['id']}/chords",
+        json={"title": "Song", "content": content, "language": "zz"},
+    )
+    lyrics = client.put(
+        f"/api/songs/{song['id']}/lyrics",
+        json={"title": "Song", "lyrics": "Line", "language": "zz"},
+    )
+
+    assert rejected.status_code == chords.status_code == lyrics.status_code == 422
+    assert song["language"] == "en"
+
+
+def test_song_import_runs_on_lyrics_workers(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(executors, "LYRICS_PROCESS_WORKERS", 2)
+    body = "\n".join(
+        json.dumps({"title": f"Song {index}", "lyrics": "La la", "language": "en"})
+        for index in range(6)
+    )
+
+    try:
+        report = client.post("/api/songs/import", content=body.encode()).json()
+    finally:
+        executors.shutdown_executors()
+
+    assert report["imported"] == 6
+    assert report["errors"] == []
+
+
+def test_lyrics_update_of_missing_song_skips_preparation(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def fail(*args: object) -> None:
+        raise AssertionError("lyrics were prepared for a missing song")
+
+    monkeypatch.setattr(songs_api, "run_prepare_lyrics", fail)
+
+    response = client.put(
+        "/api/songs/999/lyrics",
+        json={"title": "Song", "lyrics": "Line", "language": "en"},
+    )
+
+    assert response.status_code == 404
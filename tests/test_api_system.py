@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import db, main, startup
+
+
+def test_startup_timings_are_reported(
+    temp_db: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(main, "STARTUP_MODE", "prewarm")
+    with TestClient(main.app) as client:
+        client.get("/api/songs")
+        timings = client.get("/api/system/startup").json()
+
+    assert {"import", "lifespan", "prewarm", "first_request"} <= set(timings)
+    assert " /api/" in timings["first_request_path"]
+
+
+def test_cache_stats_cover_every_cache(client: TestClient) -> None:
+    stats = client.get("/api/system/caches").json()
+
+    assert {"song_responses", "syllables", "hyphenation", "language_detection"} <= set(
+        stats
+    )
+
+
+def test_legacy_rows_are_backfilled_after_startup(temp_db: Path) -> None:
+    with db._connection() as conn:
+        conn.execute(
+            "INSERT INTO songs (title, content_json, created_at, updated_at)"
+            " VALUES ('Legacy', '[{\"text\": \"Line\", \"chords\": {}}]', 't0', 't0')"
+        )
+        conn.commit()
+
+    with TestClient(main.app):
+        deadline = time.monotonic() + 10
+        while db.fetch_songs_missing_metadata(10):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+    assert "backfill" in startup.timings()
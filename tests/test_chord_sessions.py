@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from app.logic.chords import apply_structure, propagate_chords
+from app.schemas import ChordEntry, LineContent
+from app.services import chord_sessions
+
+
+def _song() -> list[LineContent]:
+    return apply_structure(
+        [
+            LineContent(text="Verse one", chords={}),
+            LineContent(text="", chords={}),
+            LineContent(text="Chorus", chords={}),
+            LineContent(text="", chords={}),
+            LineContent(text="Verse two", chords={}),
+            LineContent(text="", chords={}),
+            LineContent(text="Chorus", chords={}),
+        ]
+    )
+
+
+def test_chord_patches_list_only_propagated_lines() -> None:
+    lines = _song()
+    lines[0] = lines[0].model_copy(update={"chords": {0: ChordEntry(text="G")}})
+
+    patches = chord_sessions.chord_patches(
+        lines, propagate_chords(lines, 0, 0, "G", "en")
+    )
+
+    assert [patch.line_index for patch in patches] == [4]
+    assert patches[0].chords == {0: ChordEntry(text="G", type="auto")}
+
+
+def test_session_edits_apply_source_chord_and_propagate() -> None:
+    session_id = chord_sessions.open_session(_song(), "en")
+
+    added = chord_sessions.apply_edit(session_id, 0, 0, "G")
+    removed = chord_sessions.apply_edit(session_id, 0, 0, None)
+
+    assert added is not None and removed is not None
+    assert [(patch.line_index, patch.chords) for patch in added] == [
+        (0, {0: ChordEntry(text="G")}),
+        (4, {0: ChordEntry(text="G", type="auto")}),
+    ]
+    assert [(patch.line_index, patch.chords) for patch in removed] == [
+        (0, {}),
+        (4, {}),
+    ]
+
+    chord_sessions.close_session(session_id)
+    assert chord_sessions.apply_edit(session_id, 0, 0, "G") is None
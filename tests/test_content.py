@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from app.logic.chords import apply_structure
+from app.schemas import ChordEntry, LineContent
+from app.services.content import (
+    deserialize_content,
+    deserialize_stored_content,
+    serialize_content,
+)
+
+
+def test_stored_content_decodes_like_validated_path() -> None:
+    lines = apply_structure(
+        [
+            LineContent(
+                text="Gdy wieczorem",
+                chords={0: ChordEntry(text="G"), 4: ChordEntry(text="D", type="auto")},
+            ),
+            LineContent(text="", chords={}),
+            LineContent(text="Cicho płynie", chords={13: "Em"}),
+        ]
+    )
+    content_json = serialize_content(lines)
+
+    stored = deserialize_stored_content(content_json)
+
+    assert stored == deserialize_content(content_json)
+    assert stored[0].chords[4] == ChordEntry(text="D", type="auto")
+    assert serialize_content(stored) == content_json
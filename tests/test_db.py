@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from app import db
+
+
+def test_pooled_connections_are_reused_and_configured(temp_db: Path) -> None:
+    with db._connection() as first:
+        synchronous = first.execute("PRAGMA synchronous").fetchone()[0]
+    with db._connection() as second:
+        pass
+
+    assert second is first
+    assert synchronous == 1  # NORMAL
+
+
+def test_create_and_update_return_the_written_row(temp_db: Path) -> None:
+    created = db.create_song("Title", "[]", "en", "[]")
+    assert created == db.get_song(created.id)
+
+    updated = db.update_song(created.id, "New title", '[{"text": "x"}]', "[]")
+    assert updated is not None
+    assert updated.id == created.id
+    assert updated.title == "New title"
+    assert updated.content_json == '[{"text": "x"}]'
+    assert updated.created_at == created.created_at
+    assert updated.language == "en"
+    assert db.update_song(created.id + 1, "Missing", "[]", "[]") is None
+
+
+def test_song_change_feed_reports_written_ids(temp_db: Path) -> None:
+    assert db.poll_song_changes() is None
+    assert db.poll_song_changes() == set()
+
+    first = db.create_song("One", "[]", "pl", "[]")
+    second = db.create_song("Two", "[]", "pl", "[]")
+    db.update_song(first.id, "One!", "[]", "[]")
+
+    assert db.poll_song_changes() == {first.id, second.id}
+    assert db.poll_song_changes() == set()
+
+
+def test_song_change_feed_resets_after_log_is_pruned(temp_db: Path) -> None:
+    db.poll_song_changes()
+    song = db.create_song("One", "[]", "pl", "[]")
+    with db._connection() as conn:
+        conn.execute("DELETE FROM song_changes")
+        conn.commit()
+    db.update_song(song.id, "One!", "[]", "[]")
+
+    assert db.poll_song_changes() is None
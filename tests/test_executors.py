@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from app import executors
+from app.services.content import prepare_lyrics
+
+_REQUEST_ID: contextvars.ContextVar[str] = contextvars.ContextVar("request_id")
+
+
+def _current() -> tuple[str, str]:
+    return _REQUEST_ID.get(), threading.current_thread().name
+
+
+def test_executors_run_off_loop_with_caller_context() -> None:
+    async def run() -> tuple[tuple[str, str], tuple[str, str]]:
+        _REQUEST_ID.set("abc")
+        return await executors.run_db(_current), await executors.run_cpu(_current)
+
+    try:
+        db_call, cpu_call = asyncio.run(run())
+    finally:
+        executors.shutdown_executors()
+
+    assert db_call[0] == cpu_call[0] == "abc"
+    assert db_call[1].startswith("guitar-db")
+    assert cpu_call[1].startswith("guitar-cpu")
+
+
+def test_lyrics_run_in_warm_process_pool_with_timeout(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(executors, "LYRICS_PROCESS_WORKERS", 1)
+    lyrics = "Wlazł kotek na płotek\ni mruga"
+
+    async def run() -> tuple[str, list, str]:
+        executors.start_process_pool()
+        result = await executors.run_lyrics(prepare_lyrics, "T", lyrics, None, "pl")
+        monkeypatch.setattr(executors, "LYRICS_PROCESS_TIMEOUT_SECONDS", 0.05)
+        with pytest.raises(executors.WorkTimeout):
+            await executors.run_lyrics(time.sleep, 1)
+        return result
+
+    try:
+        title, content, language = asyncio.run(run())
+    finally:
+        executors.shutdown_executors()
+
+    assert (title, language) == ("T", "pl")
+    assert content == prepare_lyrics("T", lyrics, None, "pl")[1]
+
+
+def test_lyrics_timeout_only_stops_the_overrunning_job(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(executors, "LYRICS_PROCESS_WORKERS", 2)
+    monkeypatch.setattr(executors, "LYRICS_PROCESS_TIMEOUT_SECONDS", 1.0)
+
+    async def run() -> list:
+        executors.start_process_pool()
+        calls = [executors.run_lyrics(time.sleep, 5)]
+        calls += [executors.run_lyrics(time.sleep, 0.2) for _ in range(10)]
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        executors.shutdown_executors()
+
+    assert isinstance(results[0], executors.WorkTimeout)
+    assert results[1:] == [None] * 10
+
+
+def test_lyrics_time_limit_excludes_waiting_for_a_worker(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(executors, "LYRICS_PROCESS_WORKERS", 2)
+    monkeypatch.setattr(executors, "LYRICS_PROCESS_TIMEOUT_SECONDS", 1.0)
+
+    async def run() -> list:
+        executors.start_process_pool()
+        calls = [executors.run_lyrics(time.sleep, 0.3) for _ in range(20)]
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        executors.shutdown_executors()
+
+    assert results == [None] * 20
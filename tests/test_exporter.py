@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import auth, cli, db
+from app.api import admin
+from app.schemas import ChordEntry, LineContent
+from app.services import exporter, importer
+from app.services import songs as song_service
+
+
+def _create(title: str) -> int:
+    song = song_service.create_song(
+        title,
+        [LineContent(text="Hello world", chords={6: ChordEntry(text="G")})],
+        "en",
+    )
+    return song.id
+
+
+def test_ndjson_export_round_trips_through_import(
+    temp_db: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(exporter, "EXPORT_FETCH_SIZE", 2)
+    for index in range(5):
+        _create(f"Song {index}")
+
+    lines = list(exporter.iter_export("ndjson"))
+
+    records = [json.loads(line) for line in lines]
+    assert [record["title"] for record in records] == [f"Song {i}" for i in range(5)]
+    assert records[0]["lyrics"] == "Hello {G}world"
+    assert records[0]["content"][0]["chords"]["6"]["text"] == "G"
+    report = importer.import_songs(importer.read_ndjson(lines, "export"))
+    copy = song_service.get_song(report.ids[0])
+    assert copy is not None
+    assert copy.content[0].chords[6].text == "G"
+
+
+def test_text_export_renders_inline_chords(temp_db: Path) -> None:
+    _create("Greeting")
+
+    assert b"".join(exporter.iter_export("text")) == (
+        b"# Greeting\n\nHello {G}world\n\n"
+    )
+    with pytest.raises(ValueError):
+        list(exporter.iter_export("csv"))
+
+
+def test_export_pages_continue_after_writes(temp_db: Path) -> None:
+    ids = [_create(f"Song {index}") for index in range(3)]
+
+    chunks = db.iter_songs(1)
+    first = next(chunks)
+    song_service.update_song_chords(ids[1], "Renamed during export", [])
+    _create("Written during export")
+    rest = list(chunks)
+
+    assert [row.title for row in [first, *rest]] == [
+        "Song 0",
+        "Renamed during export",
+        "Song 2",
+        "Written during export",
+    ]
+
+
+def test_export_does_not_hold_a_pooled_connection(
+    temp_db: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _create("Greeting")
+    db.close_pool()
+    monkeypatch.setattr(db, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(db, "DB_POOL_TIMEOUT_SECONDS", 0.1)
+
+    chunks = db.iter_songs(1)
+    first = next(chunks)
+
+    assert db.get_song(first.id) is not None
+    chunks.close()
+
+
+def test_backup_is_consistent_under_concurrent_writes(
+    temp_db: Path, tmp_path: Path
+) -> None:
+    for index in range(50):
+        _create(f"Song {index}")
+    stop = threading.Event()
+
+    def write() -> None:
+        while not stop.is_set():
+            _create("Concurrent")
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        destination = tmp_path / "copy.db"
+        db.backup(destination)
+    finally:
+        stop.set()
+        writer.join()
+
+    with sqlite3.connect(destination) as copy:
+        assert copy.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert copy.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+        assert copy.execute("SELECT count(*) FROM songs").fetchone()[0] >= 50
+    assert not (tmp_path / "copy.db.partial").exists()
+
+
+def test_cli_exports_and_backs_up(
+    temp_db: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    _create("Greeting")
+    output = tmp_path / "songs.txt"
+
+    assert cli.main(["export", "--format", "text", "--output", str(output)]) == 0
+    assert cli.main(["backup", str(tmp_path / "copy.db")]) == 0
+
+    assert output.read_text(encoding="utf-8").startswith("# Greeting\n")
+    with sqlite3.connect(tmp_path / "copy.db") as copy:
+        assert copy.execute("SELECT title FROM songs").fetchall() == [("Greeting",)]
+
+
+def test_admin_backups(
+    client: TestClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(auth, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(exporter, "BACKUP_DIR", tmp_path / "backups")
+    monkeypatch.setattr(exporter, "BACKUP_KEEP", 1)
+    headers = {"X-Admin-Token": "secret"}
+
+    assert client.post("/api/admin/backups").status_code == 403
+    client.post("/api/admin/backups", headers=headers)
+    created = client.post("/api/admin/backups", headers=headers)
+
+    assert created.status_code == 201
+    name = created.json()["name"]
+    listed = client.get("/api/admin/backups", headers=headers).json()
+    assert [item["name"] for item in listed] == [name]
+    download = client.get(f"/api/admin/backups/{name}", headers=headers)
+    assert download.content.startswith(b"SQLite format 3\x00")
+    missing = client.get("/api/admin/backups/../songs.db", headers=headers)
+    assert missing.status_code == 404
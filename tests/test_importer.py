@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+import pytest
+
+from app import cli, db
+from app.services import importer
+from app.services import songs as song_service
+
+
+def test_import_songs_stores_batches_and_reports_failures(
+    temp_db: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(importer, "IMPORT_BATCH_SIZE", 2)
+    lines = [
+        json.dumps({"title": "First", "lyrics": "{G}Hello there", "language": "en"}),
+        "not json",
+        json.dumps({"title": "Second", "lyrics": "Line one\nLine two"}),
+        json.dumps({"title": "", "lyrics": "No title"}),
+        json.dumps({"title": "Klingon", "lyrics": "Text", "language": "tlh"}),
+        json.dumps({"title": "Third", "lyrics": "Last", "language": "pl"}),
+    ]
+
+    report = importer.import_songs(importer.read_ndjson(lines, "songs.ndjson"))
+
+    assert len(report.ids) == 3
+    assert [error.source for error in report.errors] == [
+        "songs.ndjson:2",
+        "songs.ndjson:4",
+        "songs.ndjson:5",
+    ]
+    first = song_service.get_song(report.ids[0])
+    assert first is not None
+    assert first.title == "First"
+    assert first.content[0].text == "Hello there"
+    assert first.content[0].chords[0].text == "G"
+    assert song_service.search_songs("Last", limit=5).items[0].id == report.ids[2]
+
+
+def test_prepare_failure_does_not_abort_batch(temp_db: Path) -> None:
+    def prepare_all(
+        func: Callable[[importer.ImportItem], importer.Prepared],
+        items: Iterable[importer.ImportItem],
+    ) -> Iterator[importer.Prepared]:
+        for item in items:
+            if item.title == "Broken":
+                yield importer.ImportFailure(item.source, "boom")
+            else:
+                yield func(item)
+
+    entries: list[importer.ImportEntry] = [
+        importer.ImportItem("a", "Good", "Text", "en"),
+        importer.ImportItem("b", "Broken", "Text", "en"),
+        importer.ImportFailure("c", "bad line"),
+    ]
+
+    report = importer.import_songs(entries, prepare_all)
+
+    assert len(report.ids) == 1
+    assert report.as_dict()["errors"] == [
+        {"source": "b", "error": "boom"},
+        {"source": "c", "error": "bad line"},
+    ]
+
+
+def test_insert_songs_returns_contiguous_ids_after_deletes(temp_db: Path) -> None:
+    first = db.insert_songs([("A", "[]", "en", "[]")])
+    with db._connection() as conn:
+        conn.execute("DELETE FROM songs")
+        conn.commit()
+
+    ids = db.insert_songs([("B", "[]", "en", "[]"), ("C", "[]", "en", "[]")])
+
+    assert ids == [first[0] + 1, first[0] + 2]
+    assert [db.get_song(song_id).title for song_id in ids] == ["B", "C"]
+
+
+def test_cli_imports_text_files(
+    temp_db: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    lyrics = tmp_path / "lyrics"
+    lyrics.mkdir()
+    (lyrics / "Morning.txt").write_text("{Am}Good morning\n", encoding="utf-8")
+    (lyrics / "Evening.txt").write_text("Good evening\n", encoding="utf-8")
+
+    assert cli.main(["import", str(lyrics), "--workers", "1", "--json"]) == 0
+
+    report = json.loads(capsys.readouterr().out)
+    assert report["imported"] == 2
+    titles = {db.get_song(song_id).title for song_id in report["ids"]}
+    assert titles == {"Morning", "Evening"}
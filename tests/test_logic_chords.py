@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 from app.logic.chords import (
+    apply_chord_edits,
     apply_structure,
     detect_structure,
     expand_chorus_references,
+    get_syllables,
     propagate_chords,
+    syllable_cache_stats,
 )
 from app.schemas import ChordEntry, LineContent
 from app.services.content import build_content_from_lyrics
@@ -159,3 +162,74 @@ def test_inline_chords_at_line_end_attach_to_eol() -> None:
     eol_index = len(content[0].text)
     assert content[0].chords[eol_index].text == "D"
     assert content[1].chords == {}
+
+
+def test_get_syllables_is_memoized_per_line_and_language() -> None:
+    text = "Memoized syllables for a repeated chorus line"
+    first = get_syllables(text, "en")
+    hits_before = syllable_cache_stats()["syllables"]["hits"]
+
+    second = get_syllables(text, "en")
+
+    assert second is first
+    assert isinstance(first, tuple)
+    assert syllable_cache_stats()["syllables"]["hits"] == hits_before + 1
+    assert [syllable.text for syllable in get_syllables(text, "xx")] == [
+        syllable.text for syllable in get_syllables(text, "pl")
+    ]
+
+
+def test_structure_pipeline_copies_only_changed_lines() -> None:
+    lines = apply_structure(
+        [
+            LineContent(text="Verse one", chords={}),
+            LineContent(text="", chords={}),
+            LineContent(text="Chorus", chords={}),
+            LineContent(text="", chords={}),
+            LineContent(text="Verse two", chords={}),
+            LineContent(text="", chords={}),
+            LineContent(text="Chorus", chords={}),
+        ]
+    )
+
+    assert apply_structure(lines) == lines
+    assert all(a is b for a, b in zip(apply_structure(lines), lines))
+
+    updated = propagate_chords(lines, 0, 0, "G", "en")
+
+    assert updated[4] is not lines[4]
+    assert lines[4].chords == {}
+    assert all(updated[index] is lines[index] for index in (0, 1, 2, 3, 5, 6))
+
+
+def test_apply_chord_edits_matches_sequential_propagation() -> None:
+    lines = apply_structure(
+        [
+            LineContent(text="Verse one goes here", chords={}),
+            LineContent(text="", chords={}),
+            LineContent(text="Chorus", chords={}),
+            LineContent(text="", chords={}),
+            LineContent(text="Verse two goes there", chords={}),
+            LineContent(text="", chords={}),
+            LineContent(text="Chorus", chords={}),
+        ]
+    )
+    edits = [(0, 0, "G"), (0, 6, "D"), (0, 0, None), (0, 10, "C")]
+
+    sequential = lines
+    for line_index, char_index, chord in edits:
+        chords = dict(sequential[line_index].chords)
+        if chord:
+            chords[char_index] = ChordEntry(text=chord, type="manual")
+        else:
+            chords.pop(char_index, None)
+        sequential = list(sequential)
+        sequential[line_index] = sequential[line_index].model_copy(
+            update={"chords": chords}
+        )
+        sequential = propagate_chords(sequential, line_index, char_index, chord, "en")
+
+    batched = apply_chord_edits(lines, edits, "en")
+
+    assert batched == sequential
+    assert sorted(batched[4].chords) == [6, 10]
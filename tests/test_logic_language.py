@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from app.logic import language
+from app.settings import DEFAULT_LANGUAGE
+
+
+def test_detect_language_caches_by_text_without_chords() -> None:
+    language.clear_language_cache()
+    text = "The quick brown fox jumps over the lazy dog and runs away"
+    before = language.language_detection_stats()
+
+    assert language.detect_language(text) == "en"
+    assert (
+        language.detect_language(
+            "{G}The quick brown fox {C}jumps over the lazy dog\nand runs away"
+        )
+        == "en"
+    )
+
+    after = language.language_detection_stats()
+    assert after["calls"] == before["calls"] + 2
+    assert after["cache_hits"] == before["cache_hits"] + 1
+
+
+def test_detect_language_counts_fallbacks() -> None:
+    before = language.language_detection_stats()["fallbacks"]
+
+    assert language.detect_language("  {Am} \n") == DEFAULT_LANGUAGE
+    assert language.detect_language("12345 !!!") == DEFAULT_LANGUAGE
+
+    after = language.language_detection_stats()["fallbacks"]
+    assert after["empty"] == before["empty"] + 1
+    assert after["undetected"] == before["undetected"] + 1
+
+
+def test_language_sample_is_bounded() -> None:
+    sample = language._sample("słowo " * 5000)
+
+    assert len(sample) <= language.LANGUAGE_SAMPLE_CHARS
+    assert sample.endswith("słowo")
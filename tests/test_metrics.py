@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app import metrics
+
+
+def test_histogram_renders_cumulative_prometheus_buckets() -> None:
+    histogram = metrics.Histogram("t_seconds", "Test.", ("route",), (0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5.0, "/a")
+
+    assert histogram.render() == [
+        "# HELP t_seconds Test.",
+        "# TYPE t_seconds histogram",
+        't_seconds_bucket{route="/a",le="0.1"} 1',
+        't_seconds_bucket{route="/a",le="1.0"} 2',
+        't_seconds_bucket{route="/a",le="+Inf"} 3',
+        't_seconds_sum{route="/a"} 5.550000',
+        't_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_metrics_endpoint_reports_cache_ratios(client: TestClient) -> None:
+    response = client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE guitar_cache_hit_ratio gauge" in response.text
+    assert 'guitar_cache_hits{cache="song_responses"}' in response.text
+
+
+def test_enabled_metrics_time_requests_and_queries(tmp_path: Path) -> None:
+    # Spans are installed at import time, so this needs a fresh interpreter.
+    script = textwrap.dedent(
+        """
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        with TestClient(app) as client:
+            client.get("/api/songs/1")
+            print(client.get("/metrics").text)
+        """
+    )
+    env = {**os.environ, "GUITAR_METRICS": "1", "GUITAR_DATA_DIR": str(tmp_path)}
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[1],
+    ).stdout
+
+    assert (
+        'guitar_http_request_duration_seconds_count{method="GET",'
+        'route="/api/songs/{song_id}",status="404"} 1'
+    ) in output
+    assert 'guitar_db_query_duration_seconds_count{query="db.get_song"} 1' in output
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import auth, profiling
+from app.api import admin
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+@pytest.fixture
+def profile_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(auth, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path / "profiles")
+    monkeypatch.setattr(profiling, "PROFILE_KEEP", 2)
+    return tmp_path / "profiles"
+
+
+def _profiled_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(profiling.ProfilingMiddleware)
+
+    @app.get("/api/work")
+    def work() -> int:
+        return sum(range(10000))
+
+    return app
+
+
+def test_admin_can_profile_a_request(profile_dir: Path) -> None:
+    client = TestClient(_profiled_app())
+
+    assert "x-profile-name" not in client.get("/api/work").headers
+    ignored = client.get(
+        "/api/work", headers={"X-Profile": "1", "X-Admin-Token": "wrong"}
+    )
+    assert "x-profile-name" not in ignored.headers
+
+    names = [
+        client.get("/api/work", headers={"X-Profile": "1", **ADMIN}).headers[
+            "x-profile-name"
+        ]
+        for _ in range(3)
+    ]
+
+    # The ring buffer keeps the newest PROFILE_KEEP profiles.
+    assert [path.name for path in profiling.list_profiles()] == names[:0:-1]
+
+
+def test_admin_endpoints_list_and_download_profiles(
+    profile_dir: Path, client: TestClient
+) -> None:
+    name = (
+        TestClient(_profiled_app())
+        .get("/api/work", headers={"X-Profile": "1", **ADMIN})
+        .headers["x-profile-name"]
+    )
+
+    assert client.get("/api/admin/profiles").status_code == 403
+    listed = client.get("/api/admin/profiles", headers=ADMIN).json()
+    assert [item["name"] for item in listed] == [name]
+
+    text = client.get(f"/api/admin/profiles/{name}?format=text", headers=ADMIN).text
+    assert "work" in text
+    raw = client.get(f"/api/admin/profiles/{name}", headers=ADMIN)
+    assert raw.content == (profile_dir / name).read_bytes()
+    missing = client.get("/api/admin/profiles/..%2Fsongs.db", headers=ADMIN)
+    assert missing.status_code == 404
+
+
+def test_admin_endpoints_are_hidden_without_a_token(client: TestClient) -> None:
+    assert client.get("/api/admin/profiles", headers=ADMIN).status_code == 404
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from app import db
+from app.schemas import LineContent
+from app.services import songs as song_service
+
+
+def _create(title: str) -> None:
+    song_service.create_song(title, [LineContent(text=f"{title} line", chords={})])
+
+
+def test_list_songs_paginates_with_cursor(temp_db: Path) -> None:
+    for index in range(5):
+        _create(f"Song {index}")
+
+    first = song_service.list_songs(limit=2)
+    second = song_service.list_songs(limit=2, after=first.next_cursor)
+    third = song_service.list_songs(limit=2, after=second.next_cursor)
+
+    titles = [song.title for page in (first, second, third) for song in page.items]
+    assert titles == ["Song 4", "Song 3", "Song 2", "Song 1", "Song 0"]
+    assert third.next_cursor is None
+
+
+def test_list_songs_rejects_malformed_cursor(temp_db: Path) -> None:
+    with pytest.raises(ValueError):
+        song_service.list_songs(limit=2, after="not-a-cursor")
+
+
+def test_backfill_stores_language_and_structure_for_legacy_rows(
+    temp_db: Path,
+) -> None:
+    content_json = (
+        '[{"text": "Verse line", "chords": {}}, {"text": "", "chords": {}},'
+        ' {"text": "Ref.", "chords": {}}, {"text": "", "chords": {}},'
+        ' {"text": "Other verse", "chords": {}}, {"text": "", "chords": {}},'
+        ' {"text": "Ref.", "chords": {}}]'
+    )
+    with db._connection() as conn:
+        conn.execute(
+            "INSERT INTO songs (title, content_json, created_at, updated_at)"
+            " VALUES ('Legacy', ?, 't0', 't0')",
+            (content_json,),
+        )
+        conn.commit()
+
+    assert song_service.backfill_song_metadata() == 1
+
+    row = db.fetch_song_summaries(1)[0]
+    stored = db.get_song(row.id)
+    assert stored is not None
+    assert stored.updated_at == "t0"
+    assert stored.language is not None
+    assert stored.structure_json is not None
+    song = song_service.get_song(row.id)
+    assert song is not None
+    assert [line.section for line in song.content] == [
+        "verse",
+        None,
+        "chorus",
+        None,
+        "verse",
+        None,
+        "chorus",
+    ]
+    assert song_service.backfill_song_metadata() == 0
+
+
+def test_backfill_skips_rows_that_fail(
+    temp_db: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    with db._connection() as conn:
+        conn.executemany(
+            "INSERT INTO songs (title, content_json, created_at, updated_at)"
+            " VALUES (?, ?, 't0', 't0')",
+            [("Broken", "not json"), ("Fine", '[{"text": "Line", "chords": {}}]')],
+        )
+        conn.commit()
+
+    assert song_service.backfill_song_metadata() == 1
+
+    assert "Could not backfill metadata of song" in caplog.text
+    assert [row.title for row in db.fetch_songs_missing_metadata(10)] == ["Broken"]
+
+
+def test_search_matches_prefixes_without_polish_diacritics(temp_db: Path) -> None:
+    song_service.create_song(
+        "Żółta łódź",
+        [LineContent(text="Płynie rzeka", chords={}), LineContent(text="Świeci")],
+        "pl",
+    )
+    song_service.create_song(
+        "Rzeka", [LineContent(text="Zupełnie inna piosenka", chords={})], "pl"
+    )
+
+    def titles(query: str) -> list[str]:
+        return [song.title for song in song_service.search_songs(query, 10).items]
+
+    assert titles("zolta lodz") == ["Żółta łódź"]
+    assert titles("plyn swiec") == ["Żółta łódź"]
+    assert titles("rzeka") == ["Rzeka", "Żółta łódź"]
+    assert titles("???") == []
+
+
+def test_search_index_follows_updates(temp_db: Path) -> None:
+    song = song_service.create_song("Old", [LineContent(text="first words")], "en")
+    song_service.update_song_chords(song.id, "New", [LineContent(text="other")])
+
+    assert song_service.search_songs("first", 10).items == []
+    assert [hit.id for hit in song_service.search_songs("other", 10).items] == [song.id]
+
+
+def test_response_cache_evicts_least_recently_used_under_byte_cap() -> None:
+    cache = song_service._ResponseCache(max_bytes=10)
+    song = song_service.EncodedSong(body=b"1234", etag='"x"')
+    cache.put((1, False), song, cache.epoch)
+    cache.put((2, False), song, cache.epoch)
+    assert cache.get((1, False)) is song
+
+    cache.put((3, False), song, cache.epoch)
+
+    assert cache.get((2, False)) is None
+    assert cache.get((1, False)) is song
+    cache.invalidate([1])
+    assert cache.get((1, False)) is None
+    assert cache.stats()["bytes"] == 4
+
+
+def test_response_cache_skips_bodies_rendered_before_an_invalidation() -> None:
+    cache = song_service._ResponseCache(max_bytes=100)
+    epoch = cache.epoch
+    cache.invalidate([1])
+
+    cache.put((1, False), song_service.EncodedSong(body=b"old", etag='"x"'), epoch)
+
+    assert cache.get((1, False)) is None
+
+
+def test_cached_song_follows_writes_from_another_process(temp_db: Path) -> None:
+    song = song_service.create_song("Before", [LineContent(text="Line", chords={})])
+    assert b"Before" in song_service.get_encoded_song(song.id).body
+
+    # A second worker has its own connections; only the database is shared.
+    other = sqlite3.connect(temp_db)
+    other.execute(
+        "UPDATE songs SET title = 'After', updated_at = 'later' WHERE id = ?",
+        (song.id,),
+    )
+    other.commit()
+    other.close()
+
+    encoded = song_service.get_encoded_song(song.id)
+    assert b"After" in encoded.body
+    assert encoded.etag == song_service.song_etag(song.id, "later", False)